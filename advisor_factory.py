@@ -0,0 +1,194 @@
+import logging
+import os
+
+import openai
+
+from advisor_service import AdvisorService
+from memory_backend import Mem0Backend, LocalMemoryBackend, HashingEmbedder, SentenceTransformerEmbedder
+from memory_cache import SearchCache
+from memory_consolidation import MemoryConsolidator, ConsolidationState
+from memory_writer import MemoryWriteQueue
+from metrics import metrics, InstrumentedMemory, InstrumentedOpenAI
+from model_router import ModelRouter, tiers_from_env
+from onboarding_slots import SlotTracker
+from onboarding_window import OnboardingWindow
+from profile_store import ProfileStore
+from response_cache import ResponseCache
+from resilience import (ResiliencePolicy, RateLimiter, CircuitBreaker, RetryPolicy,
+                        ResilientMemory, ResilientOpenAI, create_http_client)
+from streaming import first_token_log
+from user_index import UserIndex
+from working_set import WorkingSet
+
+logger = logging.getLogger(__name__)
+
+# Onboarding turns sent verbatim; older turns are folded into a running fact summary (0 disables)
+ONBOARDING_WINDOW_TURNS = int(os.getenv("ONBOARDING_WINDOW_TURNS", "4"))
+
+# Track onboarding coverage per category and end the interview once every slot is filled
+ONBOARDING_SLOT_TRACKING = os.getenv("ONBOARDING_SLOT_TRACKING", "false").lower() == "true"
+
+# Typical interview length without slot tracking, used to report turns saved
+ONBOARDING_BASELINE_TURNS = int(os.getenv("ONBOARDING_BASELINE_TURNS", "10"))
+
+# Reuse the memories retrieved earlier in an advice session for follow-up questions
+SESSION_WORKING_SET = os.getenv("SESSION_WORKING_SET", "true").lower() == "true"
+
+# Memory tokens packed into an advice prompt; also caps a session's working set
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+
+
+def create_resilience_policy(service, default_rate):
+    """Shared rate limiter, circuit breaker and retry policy for one remote service"""
+    prefix = service.upper()
+    rate = float(os.getenv(f"{prefix}_RATE_LIMIT", default_rate))
+    burst = float(os.getenv(f"{prefix}_RATE_BURST", "0")) or None
+    policy = ResiliencePolicy(
+        service,
+        limiter=RateLimiter(rate, burst) if rate > 0 else None,
+        breaker=CircuitBreaker(
+            service,
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        ),
+        retry=RetryPolicy(max_retries=int(os.getenv("CLIENT_MAX_RETRIES", "3"))),
+        queue_timeout=float(os.getenv("RATE_LIMIT_QUEUE_TIMEOUT", "30"))
+    )
+    metrics.add_collector(policy.metric_samples)
+    return policy
+
+
+def create_pooled_http_client(service, default_timeout):
+    return create_http_client(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        timeout=float(os.getenv(f"{service.upper()}_TIMEOUT", default_timeout))
+    )
+
+
+def create_memory_client(report_error=logger.error):
+    """Memory client selected by MEMORY_BACKEND (mem0 for the hosted platform, local for an offline store)"""
+    backend = os.getenv("MEMORY_BACKEND", "mem0").lower()
+    if backend == "local":
+        model_name = os.getenv("LOCAL_EMBEDDING_MODEL")
+        embedder = SentenceTransformerEmbedder(model_name) if model_name else HashingEmbedder()
+        return InstrumentedMemory(LocalMemoryBackend(os.getenv("LOCAL_MEMORY_DIR", ".memory"), embedder=embedder))
+    if backend != "mem0":
+        report_error(f"Unknown MEMORY_BACKEND '{backend}'. Use 'mem0' or 'local'.")
+        return None
+
+    mem0_api_key = os.getenv("MEM0_API_KEY")
+    if not mem0_api_key:
+        report_error("MEM0_API_KEY not found in environment variables. Please check your .env file.")
+        return None
+    backend = Mem0Backend(api_key=mem0_api_key, http_client=create_pooled_http_client("mem0", "15"))
+    return InstrumentedMemory(ResilientMemory(backend, create_resilience_policy("mem0", "20")))
+
+
+def create_openai_client(report_error=logger.error):
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        report_error("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
+        return None
+    client = openai.OpenAI(
+        api_key=openai_api_key,
+        http_client=create_pooled_http_client("openai", "60"),
+        timeout=float(os.getenv("OPENAI_TIMEOUT", "60")),
+        # Retries are handled by the shared resilience policy
+        max_retries=0
+    )
+    return InstrumentedOpenAI(ResilientOpenAI(client, create_resilience_policy("openai", "8")))
+
+
+def create_onboarding_window():
+    """Fresh onboarding window for one interview, or None when windowing is disabled"""
+    return OnboardingWindow(keep_turns=ONBOARDING_WINDOW_TURNS) if ONBOARDING_WINDOW_TURNS > 0 else None
+
+
+def create_slot_tracker():
+    """Fresh coverage tracker for one interview, or None when slot tracking is disabled"""
+    return SlotTracker(baseline_turns=ONBOARDING_BASELINE_TURNS) if ONBOARDING_SLOT_TRACKING else None
+
+
+def create_working_set():
+    """Fresh memory working set for one advice session, or None when disabled"""
+    return WorkingSet(token_budget=CONTEXT_TOKEN_BUDGET) if SESSION_WORKING_SET else None
+
+
+def create_advisor(report_error=logger.error):
+    """Build the advisor service and its shared clients, caches and indexes from environment variables"""
+    memory_client = create_memory_client(report_error)
+
+    def memory_client_for(flow):
+        # Background threads label their calls explicitly
+        return memory_client.bound(flow) if memory_client else None
+
+    search_cache = SearchCache(
+        max_size=int(os.getenv("SEARCH_CACHE_SIZE", "512")),
+        ttl=int(os.getenv("SEARCH_CACHE_TTL", "600"))
+    )
+    user_index = UserIndex(
+        lambda: memory_client_for("directory"),
+        resync_interval=int(os.getenv("USER_INDEX_RESYNC_INTERVAL", "300")),
+        page_size=int(os.getenv("USER_INDEX_PAGE_SIZE", "200"))
+    ).start()
+    write_queue = MemoryWriteQueue(
+        lambda: memory_client_for("onboarding"),
+        flush_interval=float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "2.0")),
+        max_batch_turns=int(os.getenv("MEMORY_WRITE_BATCH_TURNS", "6")),
+        # The client's resilience policy already retries each write
+        max_retries=0,
+        on_written=search_cache.invalidate_user
+    )
+
+    # Opt-in: "dry-run" only logs the plans, "on" applies them
+    consolidation_mode = os.getenv("MEMORY_CONSOLIDATION", "off").lower()
+    consolidator = MemoryConsolidator(
+        lambda: memory_client_for("consolidation"),
+        state=ConsolidationState(os.getenv("MEMORY_CONSOLIDATION_STATE", ".cache/consolidation.json")),
+        delay=float(os.getenv("MEMORY_CONSOLIDATION_DELAY", "300")),
+        threshold=float(os.getenv("MEMORY_CONSOLIDATION_THRESHOLD", "0.85")),
+        on_consolidated=search_cache.invalidate_user,
+        dry_run=consolidation_mode == "dry-run"
+    ).start() if consolidation_mode in ("on", "true", "dry-run") else None
+    if consolidator is not None:
+        metrics.add_collector(lambda: [("careercoach_memory_consolidation", {"result": key}, value)
+                                       for key, value in consolidator.stats.items()])
+
+    response_cache_size = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+    response_cache = ResponseCache(
+        os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"),
+        max_entries=response_cache_size,
+        ttl=int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+    ) if response_cache_size > 0 else None
+    if response_cache is not None:
+        metrics.add_collector(lambda: [
+            ("careercoach_response_cache_hits_total", {}, response_cache.stats()["hits"]),
+            ("careercoach_response_cache_misses_total", {}, response_cache.stats()["misses"]),
+            ("careercoach_response_cache_entries", {}, response_cache.stats()["size"]),
+        ])
+
+    metrics.add_collector(lambda: [
+        ("careercoach_search_cache_hits_total", {}, search_cache.stats()["hits"]),
+        ("careercoach_search_cache_misses_total", {}, search_cache.stats()["misses"]),
+        ("careercoach_first_token_seconds_mean", {"flow": "advice"}, first_token_log.summary("advice")["mean"]),
+        ("careercoach_first_token_seconds_mean", {"flow": "onboarding"}, first_token_log.summary("onboarding")["mean"]),
+    ] + [("careercoach_memory_writes", {"result": key}, value) for key, value in write_queue.stats.items()])
+
+    return AdvisorService(
+        memory_client,
+        create_openai_client(report_error),
+        search_cache=search_cache,
+        profile_store=ProfileStore(os.getenv("PROFILE_DIR", ".profiles")),
+        user_index=user_index,
+        write_queue=write_queue,
+        response_cache=response_cache,
+        context_token_budget=CONTEXT_TOKEN_BUDGET,
+        user_index_search_fallback=os.getenv("USER_INDEX_SEARCH_FALLBACK", "false").lower() == "true",
+        retrieval_fanout=os.getenv("RETRIEVAL_FANOUT", "true").lower() == "true",
+        fanout_top_k=int(os.getenv("RETRIEVAL_FANOUT_TOP_K", "5")),
+        followup_top_k=int(os.getenv("FOLLOWUP_TOP_K", "3")),
+        router=ModelRouter(tiers_from_env()) if os.getenv("MODEL_ROUTING", "true").lower() == "true" else None,
+        consolidator=consolidator,
+        report_error=report_error
+    )
@@ -0,0 +1,648 @@
+import asyncio
+import json
+import logging
+
+from context_builder import build_memory_context, estimate_tokens
+from metrics import with_flow, current_tier
+from model_router import Route
+from onboarding_slots import SLOT_EXTRACTION_ROLE, COVERAGE_COMPLETE_MESSAGE
+from profile_store import PROFILE_SCHEMA, extract_profile_facts, answer_from_profile
+from response_cache import ResponseCache
+from retrieval import plan_subqueries, fan_out
+from streaming import stream_chat_completion
+from working_set import WORKING_SET_HEADING
+
+logger = logging.getLogger(__name__)
+
+# Define the career advisor system role
+CAREER_ADVISOR_SYSTEM_ROLE = """
+You are CareerCoach AI, an expert career and job advisor leveraging detailed user profile information. 
+Your role is to provide personalized career guidance based on:
+
+1. The user's personal information (name, contact details, birth date)
+2. Professional background (current job, company, salary, employment type, work setting)
+3. Technical skills and expertise
+4. Previous work experience
+5. Career aspirations (desired role, industry, work setting preferences)
+6. Timeline constraints (current contract end date, certification completion)
+7. Relocation preferences
+
+IMPORTANT: Always analyze the user's question first and provide a direct, concise answer only to what they're asking:
+- For simple factual questions (e.g., "What is my birthdate?", "What is my current salary?"), provide only the specific information requested with minimal context.
+- For more complex questions seeking advice (e.g., "How can I transition to a new role?"), provide more detailed guidance.
+- Always address the user by their first name.
+- Keep responses as concise as possible while still being helpful.
+- Only include information directly relevant to their specific question.
+
+When advising users on career development:
+- Be specific and personalized, directly referencing their skills, experience, and stated preferences
+- Provide actionable recommendations for career advancement or transition
+- Suggest realistic timelines based on their current contract end date
+- Recommend skill development opportunities relevant to their career goals
+- Offer industry-specific insights for their target sector
+- Consider their work setting preferences (remote, hybrid, onsite)
+- Account for their relocation preferences when suggesting opportunities
+
+Always maintain a supportive, encouraging tone while being honest about the skills gap or additional qualifications they might need to achieve their goals.
+"""
+
+# Define the onboarding system role
+ONBOARDING_SYSTEM_ROLE = """
+You are CareerCoach AI's onboarding assistant. Your role is to collect comprehensive user information through a friendly, conversational interview process that adapts to their specific field and background.
+
+You need to collect information in these categories:
+1. Personal Information: Full name, date of birth, location, contact details (email, phone, LinkedIn), marital status
+2. Current Job Information: Current role, company, salary, employment type (full-time/part-time/contract), work setting (remote/hybrid/onsite)
+3. Field-Specific Skills & Expertise: Technical skills, tools, certifications, and competencies relevant to THEIR specific field (not generic programming questions)
+4. Work Experience: Previous roles, companies, duration, key responsibilities
+5. Career Aspirations: Desired role, preferred industry, work setting preferences, relocation willingness
+6. Timeline & Milestones: Contract end dates, certification completion dates, job search timeline
+
+CRITICAL ADAPTIVE GUIDELINES:
+- **ADAPT TO THEIR FIELD**: Once you learn their profession, ask field-specific questions:
+  * Civil Engineer → Ask about CAD software, project management tools, construction materials, certifications like PE license
+  * Teacher → Ask about subject areas, grade levels, classroom management tools, teaching certifications
+  * Nurse → Ask about specializations, medical equipment, certifications like RN/BSN, hospital systems
+  * Marketing → Ask about digital marketing tools, campaign management, analytics platforms, content creation
+  * Finance → Ask about financial software, analysis tools, CFA/CPA certifications, trading platforms
+  * Sales → Ask about CRM systems, sales methodologies, territory management, quotas
+  
+- **CONTEXT-AWARE QUESTIONING**: Base your next questions on their previous answers
+- **NATURAL FLOW**: Ask 2-3 related questions at a time to keep conversation flowing
+- **ACKNOWLEDGE & BUILD**: Always acknowledge what you learned before asking next questions
+- **SUPPORTIVE TONE**: Be encouraging throughout the process
+- **COMPLETION SIGNAL**: When you have sufficient information across all categories, say: "Perfect! I now have all the information I need to provide you with personalized career advice. You can now ask me any career-related questions!"
+
+**EXAMPLE FLOW**:
+- Start with personal info → Learn they're a Civil Engineer
+- Next questions about civil engineering projects, CAD tools, PE license (NOT programming languages)
+- Then ask about construction management experience, project types, team leadership
+- Continue with career goals in construction/infrastructure (NOT software development)
+
+Start by explaining you need to learn about them first, then begin with basic personal information.
+"""
+
+# Instructions for folding older onboarding turns into the fact summary
+ONBOARDING_SUMMARY_ROLE = """
+You maintain a running summary of facts collected during a career onboarding interview.
+You receive the current summary as JSON (one list of short facts per category) and some new conversation turns.
+Return ONLY a JSON object with the same keys: personal, current_job, skills, experience, aspirations, timeline.
+Add every new fact the user stated to the matching category, replace facts the user corrected, and keep each fact short.
+"""
+
+# Instructions for materializing the structured profile from an onboarding interview
+PROFILE_EXTRACTION_ROLE = f"""
+Extract the user's profile from this career onboarding interview.
+Return ONLY a JSON object with these sections and fields: {json.dumps(PROFILE_SCHEMA)}.
+Use short literal values exactly as the user stated them, lists for skills, tools, certifications and previous roles, and null for anything unknown.
+"""
+
+
+def format_name(name):
+    """Format name to properly capitalize each word"""
+    if not name:
+        return ""
+    words = name.split()
+    formatted_words = [word.capitalize() for word in words]
+    return " ".join(formatted_words)
+
+
+def is_full_name(name):
+    """Check if input appears to be a full name (at least two words)"""
+    if not name:
+        return False
+    words = name.strip().split()
+    return len(words) >= 2
+
+# Phrases the onboarding assistant uses once it has collected everything
+ONBOARDING_COMPLETE_MARKERS = ("now have all the information i need", "you can now ask me")
+
+# Opening message that starts the onboarding interview
+ONBOARDING_START_MESSAGE = "I'm ready to get started with the onboarding process."
+
+# Answering guidelines for session prompts, sent ahead of the working set as part of the stable prefix
+SESSION_ADVICE_GUIDELINES = """
+Remember to:
+1. Understand the specific intent of the question - is it a simple factual query or a request for advice?
+2. For factual questions (like "What is my birthdate?"), provide ONLY the specific fact with minimal context.
+3. For advice questions, provide personalized guidance considering their profile information.
+4. Always be concise and directly address their question.
+"""
+
+
+def is_onboarding_complete(ai_response):
+    """Check whether the onboarding assistant signalled that the interview is finished"""
+    lowered = (ai_response or "").lower()
+    return any(marker in lowered for marker in ONBOARDING_COMPLETE_MARKERS)
+
+
+class AdvisorService:
+    """Onboarding and advice logic shared by the Streamlit app and headless callers.
+
+    The service holds no per-session state: conversation history and the
+    onboarding window are owned by the caller and passed in. Errors are
+    reported through `report_error` (st.error in the app, logging elsewhere)
+    and answered with the same fallbacks the app has always shown.
+    """
+
+    def __init__(self, memory_client, openai_client, search_cache=None, profile_store=None,
+                 user_index=None, write_queue=None, response_cache=None, model="gpt-4o-mini", context_token_budget=600,
+                 user_index_search_fallback=False, retrieval_fanout=True, fanout_top_k=5, followup_top_k=3,
+                 router=None, consolidator=None, report_error=None):
+        self.memory_client = memory_client
+        self.openai_client = openai_client
+        self.search_cache = search_cache
+        self.profile_store = profile_store
+        self.user_index = user_index
+        self.write_queue = write_queue
+        self.response_cache = response_cache
+        self.model = model
+        self.context_token_budget = context_token_budget
+        self.user_index_search_fallback = user_index_search_fallback
+        self.retrieval_fanout = retrieval_fanout
+        self.fanout_top_k = fanout_top_k
+        self.followup_top_k = followup_top_k
+        self.router = router
+        self.consolidator = consolidator
+        self.report_error = report_error or logger.error
+
+    def _route(self, task, query=None):
+        """Model and completion budget for a request; always `self.model` without a router"""
+        if self.router is None:
+            return Route(None, self.model, None)
+        return self.router.route(task, query)
+
+    def _complete(self, messages, flow, render=None, route=None, outcome=None, **kwargs):
+        """Run a chat completion on the routed model, streaming deltas through `render` when given.
+
+        When an `outcome` dict is given, the finish reason is stored in it under "finish_reason".
+        """
+        route = route or self._route(flow)
+        if route.max_tokens:
+            kwargs.setdefault("max_tokens", route.max_tokens)
+        token = current_tier.set(route.tier)
+        try:
+            if render is not None:
+                chunks = stream_chat_completion(self.openai_client, flow=flow, outcome=outcome, model=route.model,
+                                                messages=messages, **kwargs)
+                return render(chunks)
+            response = self.openai_client.chat.completions.create(model=route.model, messages=messages, **kwargs)
+            if outcome is not None:
+                outcome["finish_reason"] = response.choices[0].finish_reason
+            return response.choices[0].message.content
+        finally:
+            current_tier.reset(token)
+
+    @with_flow("directory")
+    def check_user_exists(self, user_id):
+        """Check if user exists using the local user index, falling back to a mem0 search"""
+        if self.user_index is not None and self.user_index.ready:
+            if self.user_index.contains(user_id):
+                return True
+            if not self.user_index_search_fallback:
+                return False
+        return self.search_user_exists(user_id)
+
+    @with_flow("directory")
+    def search_user_exists(self, user_id):
+        """Check if user exists in mem0 by searching for any memories"""
+        try:
+            if not self.memory_client:
+                return False
+            
+            # Try to search for any information about the user
+            results = self.memory_client.search("personal information", user_id=user_id)
+            return len(results) > 0
+        except Exception as e:
+            self.report_error(f"Error checking user existence: {e}")
+            return False
+
+    @with_flow("onboarding")
+    def add_memory_from_conversation(self, user_message, assistant_message, user_id, background=False):
+        """Add memory from a conversation turn, optionally via the background write queue"""
+        try:
+            messages = [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": assistant_message}
+            ]
+            
+            # Keep the structured profile in step with what is stored in mem0
+            if self.profile_store is not None:
+                self.profile_store.update(user_id, extract_profile_facts(user_message))
+            
+            # Fold the new memories into the user's set once their writes settle
+            if self.consolidator is not None:
+                self.consolidator.schedule(user_id)
+            
+            if background and self.write_queue is not None:
+                self.write_queue.enqueue(user_id, messages)
+                return True
+            
+            if not self.memory_client:
+                return False
+            
+            self.memory_client.add(messages, user_id=user_id)
+            # New memories make any cached search for this user stale
+            if self.search_cache is not None:
+                self.search_cache.invalidate_user(user_id)
+            return True
+        except Exception as e:
+            self.report_error(f"Error adding memory: {e}")
+            return False
+
+    @with_flow("advice")
+    def search_memory(self, query, user_id, limit=None):
+        """Search memory and return results, serving repeat queries from cache"""
+        try:
+            if self.search_cache is not None:
+                version = self.search_cache.version(user_id)
+                cached = self.search_cache.get(user_id, query, limit)
+                if cached is not None:
+                    return cached
+            
+            if limit:
+                results = self.memory_client.search(query, user_id=user_id, limit=limit)
+            else:
+                results = self.memory_client.search(query, user_id=user_id)
+            if results and self.search_cache is not None:
+                self.search_cache.put(user_id, query, results, limit, version)
+            return results
+        except Exception as e:
+            self.report_error(f"Error searching memory: {e}")
+            return None
+
+    async def _asearch_cached(self, query, user_id, limit=None):
+        if self.search_cache is not None:
+            version = self.search_cache.version(user_id)
+            cached = self.search_cache.get(user_id, query, limit)
+            if cached is not None:
+                return cached
+        
+        if limit:
+            results = await self.memory_client.asearch(query, user_id=user_id, limit=limit)
+        else:
+            results = await self.memory_client.asearch(query, user_id=user_id)
+        if results and self.search_cache is not None:
+            self.search_cache.put(user_id, query, results, limit, version)
+        return results
+
+    @with_flow("advice")
+    async def asearch_memory(self, query, user_id):
+        """Search memory with one concurrent sub-query per profile category the question touches"""
+        try:
+            queries = plan_subqueries(query)
+            
+            async def search(sub_query):
+                # Category sub-queries only need their closest few memories
+                limit = None if sub_query == query else self.fanout_top_k
+                return await self._asearch_cached(sub_query, user_id, limit)
+            
+            return await fan_out(search, queries)
+        except Exception as e:
+            self.report_error(f"Error searching memory: {e}")
+            return None
+
+    def retrieve_memory(self, query, user_id, working_set=None):
+        """Memories for an advice question, fanned out across categories when enabled.
+
+        With a session `working_set`, only the first question runs the full
+        retrieval; follow-ups fetch just their closest `followup_top_k`
+        memories and the set supplies the rest.
+        """
+        if working_set is not None and working_set.is_followup(user_id):
+            return self._merge_working_set(working_set, self.search_memory(query, user_id, self.followup_top_k))
+        if self.retrieval_fanout and len(plan_subqueries(query)) > 1:
+            results = asyncio.run(self.asearch_memory(query, user_id))
+        else:
+            results = self.search_memory(query, user_id)
+        return self._merge_working_set(working_set, results)
+
+    @staticmethod
+    def _merge_working_set(working_set, results):
+        if working_set is None or (not results and not working_set.records):
+            return results
+        return working_set.merge(results)
+
+    def prepare_advice(self, memory_results, query, system_role=CAREER_ADVISOR_SYSTEM_ROLE, working_set=None):
+        """Build the advice prompt messages and a report on the packed memory context.
+
+        With a session `working_set` the prompt starts with the system role
+        and the working set, a prefix that only grows between questions, and
+        ends with the question and any memories that did not fit in the set.
+        """
+        if working_set is not None and working_set.records:
+            return self._prepare_session_advice(memory_results, query, system_role, working_set)
+        context_report = None
+        if memory_results:
+            memory_context, context_report = build_memory_context(memory_results, token_budget=self.context_token_budget)
+            prompt = f"""
+            The user asked: "{query}"
+            
+            Information retrieved from memory about the user:
+            {memory_context}
+            
+            Remember to:
+            1. Understand the specific intent of the question - is it a simple factual query or a request for advice?
+            2. For factual questions (like "What is my birthdate?"), provide ONLY the specific fact with minimal context.
+            3. For advice questions, provide personalized guidance considering their profile information.
+            4. Always be concise and directly address their question.
+            
+            Now, provide a personalized response that directly answers their specific question.
+            """
+        else:
+            prompt = query
+        
+        messages = [
+            {"role": "system", "content": system_role},
+            {"role": "user", "content": prompt}
+        ]
+        return messages, context_report
+
+    def _prepare_session_advice(self, memory_results, query, system_role, working_set):
+        prompt = f'The user asked: "{query}"'
+        if working_set.pending:
+            prompt += f"\n\nFurther information retrieved for this question:\n{working_set.pending_context()}"
+        prompt += "\n\nNow, provide a personalized response that directly answers their specific question."
+        messages = [
+            {"role": "system", "content": system_role + SESSION_ADVICE_GUIDELINES},
+            {"role": "system", "content": f"{WORKING_SET_HEADING}\n{working_set.context()}"},
+            {"role": "user", "content": prompt}
+        ]
+        working_set.record_prompt(messages)
+        raw_tokens = estimate_tokens(json.dumps(memory_results, indent=2))
+        context_tokens = working_set.tokens + estimate_tokens(working_set.pending_context())
+        context_report = {
+            "memories_in": len(memory_results) + working_set.duplicates_dropped,
+            "duplicates_dropped": working_set.duplicates_dropped,
+            "memories_kept": len(working_set.records) + len(working_set.pending),
+            "raw_tokens": raw_tokens,
+            "context_tokens": context_tokens,
+            "tokens_saved": max(0, raw_tokens - context_tokens),
+            "working_set": working_set.report(),
+        }
+        return messages, context_report
+
+    def advice_cache_key(self, user_id, memory_results, query, system_role=CAREER_ADVISOR_SYSTEM_ROLE):
+        """Response cache key for a user's question and its retrieved memories, or None when caching is off"""
+        if self.response_cache is None:
+            return None
+        route = self._route("advice", query)
+        return ResponseCache.key(system_role, query, memory_results,
+                                 namespace=f"{route.model}:{route.max_tokens}:{self.context_token_budget}",
+                                 user_id=user_id)
+
+    def cached_advice(self, cache_key, render=None):
+        """Return a previously generated answer, replayed through `render` when given, or None"""
+        if cache_key is None:
+            return None
+        try:
+            answer = self.response_cache.get(cache_key)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            return None
+        if answer is None:
+            return None
+        return render(iter([answer])) if render is not None else answer
+
+    @with_flow("advice")
+    def complete_advice(self, messages, render=None, cache_key=None, query=None):
+        """Get the advice answer for prepared messages, storing it under `cache_key` when given.
+
+        `query` is the user's question, used to route it to a model tier.
+        Answers cut off at the tier's completion budget are not cached.
+        """
+        outcome = {}
+        try:
+            answer = self._complete(messages, "advice", render, route=self._route("advice", query), outcome=outcome)
+        except Exception as e:
+            self.report_error(f"Error getting ChatGPT response: {e}")
+            return f"I encountered an error while processing your request: {str(e)}"
+        if outcome.get("finish_reason") == "length":
+            logger.warning("Advice answer hit the completion budget; not caching it")
+        elif cache_key is not None and answer:
+            try:
+                self.response_cache.put(cache_key, answer)
+            except Exception as e:
+                logger.warning("Response cache write failed: %s", e)
+        return answer
+
+    def get_chatgpt_response(self, memory_results, query, system_role=CAREER_ADVISOR_SYSTEM_ROLE, render=None,
+                             user_id=None):
+        """Get response from ChatGPT based on memory results, reusing a cached answer for the same memories.
+
+        Answers are only cached when `user_id` is given, so one user never gets another's answer.
+        """
+        cache_key = self.advice_cache_key(user_id, memory_results, query, system_role) if user_id else None
+        cached = self.cached_advice(cache_key, render)
+        if cached is not None:
+            return cached
+        messages, _ = self.prepare_advice(memory_results, query, system_role)
+        return self.complete_advice(messages, render, cache_key, query)
+
+    def answer_from_profile(self, user_id, query):
+        """Answer a simple factual question from the structured profile, or return None"""
+        if self.profile_store is None or not query:
+            return None
+        return answer_from_profile(self.profile_store.get(user_id), query, user_id)
+
+    def advise(self, user_id, query, render=None, refresh=False, working_set=None):
+        """Answer a career question end to end.
+
+        Returns a dict with the answer, where it came from ("profile", "cache",
+        "llm" or "not_found"), the memories used and the context packing
+        report. `refresh` skips the response cache lookup and regenerates.
+        `working_set` carries the memories already retrieved in this session.
+        """
+        profile_answer = self.answer_from_profile(user_id, query)
+        if profile_answer:
+            return {"answer": profile_answer, "source": "profile", "memory_results": None, "context_report": None}
+        
+        memory_results = self.retrieve_memory(query, user_id, working_set)
+        if not memory_results:
+            return {"answer": None, "source": "not_found", "memory_results": memory_results, "context_report": None}
+        
+        cache_key = self.advice_cache_key(user_id, memory_results, query)
+        cached = None if refresh else self.cached_advice(cache_key, render)
+        if cached is not None:
+            return {"answer": cached, "source": "cache", "memory_results": memory_results, "context_report": None}
+        
+        messages, context_report = self.prepare_advice(memory_results, query, working_set=working_set)
+        answer = self.complete_advice(messages, render, cache_key, query)
+        return {"answer": answer, "source": "llm", "memory_results": memory_results, "context_report": context_report}
+
+    async def aadvise(self, user_id, query, refresh=False, working_set=None):
+        """Asyncio version of `advise` for callers that already run an event loop"""
+        profile_answer = self.answer_from_profile(user_id, query)
+        if profile_answer:
+            return {"answer": profile_answer, "source": "profile", "memory_results": None, "context_report": None}
+        
+        if working_set is not None and working_set.is_followup(user_id):
+            memory_results = await asyncio.to_thread(self.search_memory, query, user_id, self.followup_top_k)
+        elif self.retrieval_fanout:
+            memory_results = await self.asearch_memory(query, user_id)
+        else:
+            memory_results = await asyncio.to_thread(self.search_memory, query, user_id)
+        memory_results = self._merge_working_set(working_set, memory_results)
+        if not memory_results:
+            return {"answer": None, "source": "not_found", "memory_results": memory_results, "context_report": None}
+        
+        cache_key = self.advice_cache_key(user_id, memory_results, query)
+        cached = None if refresh else await asyncio.to_thread(self.cached_advice, cache_key)
+        if cached is not None:
+            return {"answer": cached, "source": "cache", "memory_results": memory_results, "context_report": None}
+        
+        messages, context_report = self.prepare_advice(memory_results, query, working_set=working_set)
+        answer = await asyncio.to_thread(self.complete_advice, messages, None, cache_key, query)
+        return {"answer": answer, "source": "llm", "memory_results": memory_results, "context_report": context_report}
+
+    @with_flow("onboarding")
+    def update_profile_from_conversation(self, user_id, conversation_history):
+        """Materialize the structured profile from a full onboarding interview with one LLM call"""
+        if self.profile_store is None:
+            return False
+        try:
+            transcript = "\n".join(f"{m['role']}: {m['content']}" for m in conversation_history)
+            content = self._complete(
+                [
+                    {"role": "system", "content": PROFILE_EXTRACTION_ROLE},
+                    {"role": "user", "content": transcript}
+                ],
+                "onboarding",
+                route=self._route("extraction"),
+                response_format={"type": "json_object"}
+            )
+            self.profile_store.update(user_id, json.loads(content))
+            return True
+        except Exception as e:
+            self.report_error(f"Error building your profile: {e}")
+            return False
+
+    @with_flow("onboarding")
+    def summarize_onboarding_turns(self, summary, messages):
+        """Fold older onboarding turns into the per-category fact summary using the LLM"""
+        content = self._complete(
+            [
+                {"role": "system", "content": ONBOARDING_SUMMARY_ROLE},
+                {"role": "user", "content": json.dumps({"summary": summary, "new_turns": messages})}
+            ],
+            "onboarding",
+            route=self._route("extraction"),
+            response_format={"type": "json_object"}
+        )
+        return json.loads(content)
+
+    @with_flow("onboarding")
+    def extract_onboarding_slots(self, question, answer, tracker):
+        """Fill interview slots from one answer with the regex extractor, then a structured-output call.
+
+        The call is skipped when the regex extractor already covered every missing slot.
+        """
+        filled = tracker.update(extract_profile_facts(answer))
+        if tracker.complete:
+            return filled
+        payload = json.dumps({"question": question, "answer": answer})
+        try:
+            content = self._complete(
+                [
+                    {"role": "system", "content": SLOT_EXTRACTION_ROLE},
+                    {"role": "user", "content": payload}
+                ],
+                "onboarding",
+                route=self._route("extraction"),
+                response_format={"type": "json_object"}
+            )
+            tracker.record_extraction(estimate_tokens(SLOT_EXTRACTION_ROLE) + estimate_tokens(payload))
+            slots = json.loads(content)
+            return tracker.update(slots if isinstance(slots, dict) else {})
+        except Exception as e:
+            logger.warning("Slot extraction failed: %s", e)
+            return 0
+
+    @with_flow("onboarding")
+    def get_onboarding_response(self, conversation_history, render=None, window=None, tracker=None):
+        """Get onboarding response from ChatGPT"""
+        try:
+            if window is not None:
+                # Bounded prompt: recent turns verbatim plus a summary of older ones
+                messages = window.build_messages(ONBOARDING_SYSTEM_ROLE, conversation_history, self.summarize_onboarding_turns)
+            else:
+                messages = [{"role": "system", "content": ONBOARDING_SYSTEM_ROLE}]
+                messages.extend(conversation_history)
+            
+            if tracker is not None:
+                # Steer the next question to the slots that are still missing; appended last so the
+                # system role and history stay a stable prefix for provider prompt caching
+                messages.append({"role": "system", "content": tracker.format_prompt()})
+                tracker.record_prompt(messages, conversation_history, ONBOARDING_SYSTEM_ROLE)
+            
+            return self._complete(messages, "onboarding", render)
+        except Exception as e:
+            self.report_error(f"Error getting onboarding response: {e}")
+            return f"I encountered an error: {str(e)}"
+
+    def start_onboarding(self, user_id=None, render=None, tracker=None):
+        """Return the assistant's opening onboarding message.
+
+        The name entered to start the interview fills the tracker's full name slot.
+        """
+        if tracker is not None and user_id:
+            tracker.update({"personal": {"full_name": user_id}})
+        return self.get_onboarding_response([{"role": "user", "content": ONBOARDING_START_MESSAGE}],
+                                            render=render, tracker=tracker)
+
+    def onboarding_turn(self, user_id, conversation_history, user_input, window=None, render=None, tracker=None):
+        """Run one onboarding turn, appending both messages to `conversation_history`.
+
+        The turn is queued for a batched memory write. With a slot `tracker`,
+        the answer is extracted into interview slots first and the interview
+        closes as soon as every category is covered, without another model
+        turn. On completion, pending writes are flushed, the structured
+        profile is materialized and the user is added to the user index.
+        """
+        conversation_history.append({"role": "user", "content": user_input})
+        if tracker is not None:
+            tracker.turns += 1
+            question = conversation_history[-2]["content"] if len(conversation_history) > 1 else ""
+            self.extract_onboarding_slots(question, user_input, tracker)
+        
+        if tracker is not None and tracker.complete:
+            tracker.record_skipped_call(estimate_tokens(ONBOARDING_SYSTEM_ROLE) +
+                                        sum(estimate_tokens(m["content"]) for m in conversation_history))
+            ai_response = COVERAGE_COMPLETE_MESSAGE
+            if render is not None:
+                render(iter([ai_response]))
+        else:
+            ai_response = self.get_onboarding_response(conversation_history, render=render, window=window, tracker=tracker)
+        conversation_history.append({"role": "assistant", "content": ai_response})
+        
+        # Queue the conversation turn for a batched mem0 write
+        self.add_memory_from_conversation(user_input, ai_response, user_id, background=True)
+        
+        complete = (tracker is not None and tracker.complete) or is_onboarding_complete(ai_response)
+        if complete:
+            self.finish_onboarding(user_id, conversation_history, tracker)
+        result = {"response": ai_response, "complete": complete}
+        if tracker is not None:
+            result["report"] = tracker.report()
+        return result
+
+    def finish_onboarding(self, user_id, conversation_history, tracker=None):
+        """Persist a completed interview before advice queries run; return False if mem0 has not got it yet"""
+        saved = True
+        if self.write_queue is not None:
+            saved = self.write_queue.flush(user_id)
+            if not saved:
+                # A batch was dropped or is still waiting on mem0: queue the whole interview again
+                self.write_queue.enqueue(user_id, conversation_history[1:])
+        if tracker is not None and tracker.complete and self.profile_store is not None:
+            # The filled slots already are the structured profile
+            self.profile_store.update(user_id, tracker.known_profile())
+            tracker.record_skipped_call(estimate_tokens(PROFILE_EXTRACTION_ROLE) +
+                                        sum(estimate_tokens(m["content"]) for m in conversation_history))
+        else:
+            self.update_profile_from_conversation(user_id, conversation_history)
+        if not saved:
+            self.report_error("Your answers could not be saved to memory yet; they will be retried in the background.")
+        elif self.user_index is not None:
+            self.user_index.add(user_id)
+        return saved
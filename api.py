@@ -0,0 +1,260 @@
+"""Headless HTTP API for CareerCoach AI, outside Streamlit's rerun model.
+
+A dependency-free ASGI application exposing the AdvisorService:
+
+    POST /onboard/turn   {"user_id", "history": [...], "message", "window": {...}, "slots": {...}}
+    POST /advise         {"user_id", "query", "refresh": false, "working_set": {...}}
+    POST /advise/batch   {"requests": [{"user_id", "query"}, ...]}
+    GET  /healthz
+    GET  /metrics        Prometheus text (?format=json for the JSON dump)
+
+Onboarding is stateless: callers send back the history and window state
+and slot tracker state returned by the previous turn. Follow-up advice
+questions likewise send back the returned working set, so they only fetch
+memories the session has not seen yet. Advice runs on the event loop with its memory
+searches fanned out concurrently; the remaining blocking service calls run on
+a bounded thread pool while the event loop keeps accepting requests.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+# Load environment variables before the service modules read their settings
+load_dotenv()
+
+from advisor_factory import create_advisor, create_onboarding_window, create_slot_tracker, create_working_set
+from metrics import metrics
+from onboarding_slots import SlotTracker
+from onboarding_window import OnboardingWindow
+from resilience import current_session
+from working_set import WorkingSet
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _require_str(body, field):
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{field}' must be a non-empty string")
+    return value.strip()
+
+
+def _restore_state(body, field, from_dict, default):
+    """Rebuild session state a stateless caller sent back, or start fresh when there is none"""
+    state = body.get(field)
+    if state is None:
+        return default()
+    if not isinstance(state, dict):
+        raise HTTPError(400, f"'{field}' must be an object returned by a previous response")
+    try:
+        return from_dict(state)
+    except (TypeError, ValueError, AttributeError, KeyError) as e:
+        raise HTTPError(400, f"'{field}' is not a valid state: {e}")
+
+
+def _serialize_advice(result, include_memories=False):
+    payload = {"answer": result["answer"], "source": result["source"], "context_report": result["context_report"]}
+    if include_memories:
+        payload["memory_results"] = result["memory_results"]
+    return payload
+
+
+class AdvisorAPI:
+    """ASGI application serving onboarding and advice requests"""
+
+    def __init__(self, advisor=None, max_workers=None, batch_concurrency=None, max_batch_size=None):
+        self._advisor = advisor
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("ADVISOR_API_WORKERS", "32")),
+            thread_name_prefix="advisor-api"
+        )
+        self.batch_concurrency = batch_concurrency or int(os.getenv("ADVISOR_API_BATCH_CONCURRENCY", "16"))
+        self.max_batch_size = max_batch_size or int(os.getenv("ADVISOR_API_MAX_BATCH", "100"))
+        self.routes = {
+            ("POST", "/onboard/turn"): self.onboard_turn,
+            ("POST", "/advise"): self.advise,
+            ("POST", "/advise/batch"): self.advise_batch,
+            ("GET", "/healthz"): self.healthz,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    @property
+    def advisor(self):
+        if self._advisor is None:
+            self._advisor = create_advisor()
+        return self._advisor
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry the caller's session into the worker thread for fair rate limiting
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, func, *args, **kwargs))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        handler = self.routes.get((method, path))
+        try:
+            if handler is None:
+                allowed = any(p == path for _, p in self.routes)
+                raise HTTPError(405 if allowed else 404, "method not allowed" if allowed else "not found")
+            body = await self._read_json(receive) if method == "POST" else {}
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            status, payload = await handler(body, query)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        if isinstance(payload, str):
+            await self._send(send, status, payload.encode("utf-8"), b"text/plain; version=0.0.4")
+        else:
+            await self._send(send, status, json.dumps(payload).encode("utf-8"), b"application/json")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Build clients and seed the user index before taking traffic
+                await self._run(lambda: self.advisor)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._advisor is not None and self._advisor.write_queue is not None:
+                    await self._run(self._advisor.write_queue.close)
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_json(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        raw = b"".join(chunks)
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return body
+
+    async def _send(self, send, status, body, content_type):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def onboard_turn(self, body, query):
+        """Run one onboarding turn; an empty history and message starts the interview"""
+        user_id = _require_str(body, "user_id")
+        current_session.set(user_id)
+        history = body.get("history") or []
+        if not isinstance(history, list) or not all(
+                isinstance(m, dict) and m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)
+                for m in history):
+            raise HTTPError(400, "'history' must be a list of {role, content} messages")
+        window = _restore_state(body, "window", OnboardingWindow.from_dict, create_onboarding_window)
+        tracker = _restore_state(body, "slots", SlotTracker.from_dict, create_slot_tracker)
+
+        message = body.get("message")
+        report = None
+        if not history and not message:
+            response = await self._run(self.advisor.start_onboarding, user_id, tracker=tracker)
+            history = [{"role": "assistant", "content": response}]
+            complete = False
+        else:
+            message = _require_str(body, "message")
+            turn = await self._run(self.advisor.onboarding_turn, user_id, history, message, window=window, tracker=tracker)
+            response, complete, report = turn["response"], turn["complete"], turn.get("report")
+
+        return 200, {
+            "response": response,
+            "complete": complete,
+            "history": history,
+            "window": window.to_dict() if window is not None else None,
+            "slots": tracker.to_dict() if tracker is not None else None,
+            "report": report,
+        }
+
+    async def advise(self, body, query):
+        user_id = _require_str(body, "user_id")
+        question = _require_str(body, "query")
+        current_session.set(user_id)
+        working_set = _restore_state(
+            body, "working_set",
+            functools.partial(WorkingSet.from_dict, token_budget=self.advisor.context_token_budget),
+            create_working_set)
+        result = await self.advisor.aadvise(user_id, question, refresh=bool(body.get("refresh")),
+                                            working_set=working_set)
+        payload = _serialize_advice(result, bool(body.get("include_memories")))
+        payload["working_set"] = working_set.to_dict() if working_set is not None else None
+        return 200, payload
+
+    async def advise_batch(self, body, query):
+        """Answer many questions concurrently; results keep the request order"""
+        requests = body.get("requests")
+        if not isinstance(requests, list) or not requests:
+            raise HTTPError(400, "'requests' must be a non-empty list")
+        if len(requests) > self.max_batch_size:
+            raise HTTPError(413, f"at most {self.max_batch_size} requests per batch")
+        include_memories = bool(body.get("include_memories"))
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def answer(item):
+            try:
+                if not isinstance(item, dict):
+                    raise HTTPError(400, "each request must be an object")
+                user_id = _require_str(item, "user_id")
+                question = _require_str(item, "query")
+                current_session.set(user_id)
+                async with semaphore:
+                    result = await self.advisor.aadvise(user_id, question, refresh=bool(item.get("refresh")))
+                return _serialize_advice(result, include_memories)
+            except HTTPError as e:
+                return {"error": e.message}
+            except Exception as e:
+                return {"error": str(e)}
+
+        return 200, {"results": await asyncio.gather(*(answer(item) for item in requests))}
+
+    async def healthz(self, body, query):
+        return 200, {"status": "ok"}
+
+    async def metrics(self, body, query):
+        if query.get("format") == ["json"]:
+            return 200, metrics.summary()
+        return 200, metrics.to_prometheus()
+
+
+app = AdvisorAPI()
@@ -1,14 +1,17 @@
-import json
 import streamlit as st
-from mem0 import MemoryClient
-import openai  # For ChatGPT integration
-import re
 import os
+import uuid
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file before the service modules read their settings
 load_dotenv()
 
+from advisor_factory import create_advisor, create_onboarding_window, create_slot_tracker, create_working_set
+from advisor_service import format_name, is_full_name
+from streaming import render_stream, first_token_log
+from metrics import metrics, start_metrics_server
+from resilience import current_session
+
 # Page configuration
 st.set_page_config(
     page_title="CareerCoach AI",
@@ -16,201 +19,36 @@ st.set_page_config(
     layout="centered"
 )
 
-# Initialize the Memory client
-@st.cache_resource
-def get_memory_client():
-    mem0_api_key = os.getenv("MEM0_API_KEY")
-    if not mem0_api_key:
-        st.error("MEM0_API_KEY not found in environment variables. Please check your .env file.")
-        return None
-    return MemoryClient(api_key=mem0_api_key)
+# Number of profiles shown per page in the sidebar directory
+DIRECTORY_PAGE_SIZE = int(os.getenv("DIRECTORY_PAGE_SIZE", "20"))
 
-# Initialize OpenAI client
+# Export latency, token and cost metrics; METRICS_PORT serves /metrics and /metrics.json
 @st.cache_resource
-def get_openai_client():
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        st.error("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
-        return None
-    return openai.OpenAI(api_key=openai_api_key)
-
-# Define the career advisor system role
-CAREER_ADVISOR_SYSTEM_ROLE = """
-You are CareerCoach AI, an expert career and job advisor leveraging detailed user profile information. 
-Your role is to provide personalized career guidance based on:
-
-1. The user's personal information (name, contact details, birth date)
-2. Professional background (current job, company, salary, employment type, work setting)
-3. Technical skills and expertise
-4. Previous work experience
-5. Career aspirations (desired role, industry, work setting preferences)
-6. Timeline constraints (current contract end date, certification completion)
-7. Relocation preferences
-
-IMPORTANT: Always analyze the user's question first and provide a direct, concise answer only to what they're asking:
-- For simple factual questions (e.g., "What is my birthdate?", "What is my current salary?"), provide only the specific information requested with minimal context.
-- For more complex questions seeking advice (e.g., "How can I transition to a new role?"), provide more detailed guidance.
-- Always address the user by their first name.
-- Keep responses as concise as possible while still being helpful.
-- Only include information directly relevant to their specific question.
-
-When advising users on career development:
-- Be specific and personalized, directly referencing their skills, experience, and stated preferences
-- Provide actionable recommendations for career advancement or transition
-- Suggest realistic timelines based on their current contract end date
-- Recommend skill development opportunities relevant to their career goals
-- Offer industry-specific insights for their target sector
-- Consider their work setting preferences (remote, hybrid, onsite)
-- Account for their relocation preferences when suggesting opportunities
-
-Always maintain a supportive, encouraging tone while being honest about the skills gap or additional qualifications they might need to achieve their goals.
-"""
+def start_metrics_export():
+    port = os.getenv("METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
 
-# Define the onboarding system role
-ONBOARDING_SYSTEM_ROLE = """
-You are CareerCoach AI's onboarding assistant. Your role is to collect comprehensive user information through a friendly, conversational interview process that adapts to their specific field and background.
+start_metrics_export()
 
-You need to collect information in these categories:
-1. Personal Information: Full name, date of birth, location, contact details (email, phone, LinkedIn), marital status
-2. Current Job Information: Current role, company, salary, employment type (full-time/part-time/contract), work setting (remote/hybrid/onsite)
-3. Field-Specific Skills & Expertise: Technical skills, tools, certifications, and competencies relevant to THEIR specific field (not generic programming questions)
-4. Work Experience: Previous roles, companies, duration, key responsibilities
-5. Career Aspirations: Desired role, preferred industry, work setting preferences, relocation willingness
-6. Timeline & Milestones: Contract end dates, certification completion dates, job search timeline
+# Show the latency/cost admin panel in the sidebar
+ADMIN_PANEL = os.getenv("ADMIN_PANEL", "false").lower() == "true"
 
-CRITICAL ADAPTIVE GUIDELINES:
-- **ADAPT TO THEIR FIELD**: Once you learn their profession, ask field-specific questions:
-  * Civil Engineer → Ask about CAD software, project management tools, construction materials, certifications like PE license
-  * Teacher → Ask about subject areas, grade levels, classroom management tools, teaching certifications
-  * Nurse → Ask about specializations, medical equipment, certifications like RN/BSN, hospital systems
-  * Marketing → Ask about digital marketing tools, campaign management, analytics platforms, content creation
-  * Finance → Ask about financial software, analysis tools, CFA/CPA certifications, trading platforms
-  * Sales → Ask about CRM systems, sales methodologies, territory management, quotas
-  
-- **CONTEXT-AWARE QUESTIONING**: Base your next questions on their previous answers
-- **NATURAL FLOW**: Ask 2-3 related questions at a time to keep conversation flowing
-- **ACKNOWLEDGE & BUILD**: Always acknowledge what you learned before asking next questions
-- **SUPPORTIVE TONE**: Be encouraging throughout the process
-- **COMPLETION SIGNAL**: When you have sufficient information across all categories, say: "Perfect! I now have all the information I need to provide you with personalized career advice. You can now ask me any career-related questions!"
-
-**EXAMPLE FLOW**:
-- Start with personal info → Learn they're a Civil Engineer
-- Next questions about civil engineering projects, CAD tools, PE license (NOT programming languages)
-- Then ask about construction management experience, project types, team leadership
-- Continue with career goals in construction/infrastructure (NOT software development)
-
-Start by explaining you need to learn about them first, then begin with basic personal information.
-"""
-
-def format_name(name):
-    """Format name to properly capitalize each word"""
-    if not name:
-        return ""
-    words = name.split()
-    formatted_words = [word.capitalize() for word in words]
-    return " ".join(formatted_words)
-
-def is_full_name(name):
-    """Check if input appears to be a full name (at least two words)"""
-    if not name:
-        return False
-    words = name.strip().split()
-    return len(words) >= 2
-
-def check_user_exists(user_id):
-    """Check if user exists in mem0 by searching for any memories"""
-    try:
-        client = get_memory_client()
-        if not client:
-            return False
-        
-        # Try to search for any information about the user
-        results = client.search("personal information", user_id=user_id)
-        return len(results) > 0
-    except Exception as e:
-        st.error(f"Error checking user existence: {e}")
-        return False
+# Stream completions token by token into the UI instead of waiting for the full answer
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
 
-def add_memory_from_conversation(user_message, assistant_message, user_id):
-    """Add memory from a conversation turn"""
-    try:
-        client = get_memory_client()
-        if not client:
-            return False
-        
-        messages = [
-            {"role": "user", "content": user_message},
-            {"role": "assistant", "content": assistant_message}
-        ]
-        
-        client.add(messages, user_id=user_id)
-        return True
-    except Exception as e:
-        st.error(f"Error adding memory: {e}")
-        return False
+# Styled container used for advice answers
+ANSWER_HTML = "<div style='background-color:#393E46; padding:20px; border-radius:10px; color:white;'>{}</div>"
 
-def search_memory(query, user_id):
-    """Search memory and return results"""
-    try:
-        client = get_memory_client()
-        results = client.search(query, user_id=user_id)
-        return results
-    except Exception as e:
-        st.error(f"Error searching memory: {e}")
-        return None
+# Onboarding and advice service with its clients, caches and indexes, shared by every session
+@st.cache_resource
+def get_advisor():
+    return create_advisor(report_error=st.error)
 
-def get_chatgpt_response(memory_results, query, system_role=CAREER_ADVISOR_SYSTEM_ROLE):
-    """Get response from ChatGPT based on memory results"""
-    try:
-        if memory_results:
-            prompt = f"""
-            The user asked: "{query}"
-            
-            Information retrieved from memory about the user:
-            {json.dumps(memory_results, indent=2)}
-            
-            Remember to:
-            1. Understand the specific intent of the question - is it a simple factual query or a request for advice?
-            2. For factual questions (like "What is my birthdate?"), provide ONLY the specific fact with minimal context.
-            3. For advice questions, provide personalized guidance considering their profile information.
-            4. Always be concise and directly address their question.
-            
-            Now, provide a personalized response that directly answers their specific question.
-            """
-        else:
-            prompt = query
-        
-        openai_client = get_openai_client()
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_role},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error getting ChatGPT response: {e}")
-        return f"I encountered an error while processing your request: {str(e)}"
+def stream_to(placeholder, template="{}", unsafe_allow_html=False, timing=None):
+    """Renderer that streams completion deltas into a Streamlit placeholder"""
+    return lambda chunks: render_stream(chunks, placeholder, template, unsafe_allow_html, timing)
 
-def get_onboarding_response(conversation_history):
-    """Get onboarding response from ChatGPT"""
-    try:
-        openai_client = get_openai_client()
-        
-        messages = [{"role": "system", "content": ONBOARDING_SYSTEM_ROLE}]
-        messages.extend(conversation_history)
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error getting onboarding response: {e}")
-        return f"I encountered an error: {str(e)}"
+advisor = get_advisor()
 
 # Initialize session state variables
 if 'name_entered' not in st.session_state:
@@ -237,47 +75,55 @@ if 'show_names' not in st.session_state:
     st.session_state.show_names = True
 if 'registered_users' not in st.session_state:
     st.session_state.registered_users = []
-
-def get_all_users_from_mem0():
-    """Fetch all user names from mem0 using the users() API"""
-    try:
-        client = get_memory_client()
-        if not client:
-            return []
-        
-        # Use the direct users() API method
-        results = client.users()
-        
-        # Extract just the names from the results
-        user_names = []
-        if results and 'results' in results:
-            for user in results['results']:
-                if 'name' in user:
-                    user_names.append(user['name'])
-        
-        return sorted(user_names)
-    except Exception as e:
-        st.error(f"Error fetching users from mem0: {e}")
-        return []
-
-# Get all users from mem0 dynamically
-@st.cache_data(ttl=300)  # Cache for 5 minutes to avoid repeated API calls
-def get_cached_users():
-    return get_all_users_from_mem0()
-
-existing_users = get_cached_users()
+if 'directory_query' not in st.session_state:
+    st.session_state.directory_query = ""
+if 'directory_page' not in st.session_state:
+    st.session_state.directory_page = 0
+if 'onboarding_window' not in st.session_state:
+    st.session_state.onboarding_window = create_onboarding_window()
+if 'slot_tracker' not in st.session_state:
+    st.session_state.slot_tracker = create_slot_tracker()
+if 'working_set' not in st.session_state:
+    st.session_state.working_set = create_working_set()
+if 'onboarding_report' not in st.session_state:
+    st.session_state.onboarding_report = None
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
+
+# Rate-limited API calls are queued fairly per browser session
+current_session.set(st.session_state.session_key)
 
 # Callback functions for buttons
 def on_name_submit():
     st.session_state.submit_clicked = True
     st.session_state.show_names = False
 
+def on_directory_search():
+    st.session_state.directory_page = 0
+
+def select_profile(name):
+    st.session_state.user_id = name
+    st.session_state.name_entered = True
+    st.session_state.user_exists = True
+    st.session_state.onboarding_complete = True
+    st.session_state.show_names = False
+
 def on_reset_name():
+    # Push any buffered onboarding turns to mem0 before leaving this profile
+    if st.session_state.user_id:
+        advisor.write_queue.flush(st.session_state.user_id, wait=False)
     st.session_state.reset_name_clicked = True
     st.session_state.show_names = True
     st.session_state.onboarding_complete = False
     st.session_state.onboarding_started = False
     st.session_state.conversation_history = []
+    if st.session_state.onboarding_window is not None:
+        st.session_state.onboarding_window.reset()
+    if st.session_state.slot_tracker is not None:
+        st.session_state.slot_tracker.reset()
+    if st.session_state.working_set is not None:
+        st.session_state.working_set.reset()
+    st.session_state.onboarding_report = None
 
 # App header
 st.title("CareerCoach AI")
@@ -295,61 +141,47 @@ if not st.session_state.name_entered and st.session_state.show_names:
     with st.sidebar:
         st.header("Available Profiles")
         
-        # Refresh button to reload users from mem0
-        if st.button("🔄 Refresh User List", help="Reload users from database"):
-            st.cache_data.clear()  # Clear cache to force refresh
-            st.rerun()
+        user_index = advisor.user_index
+        
+        # Refresh button to pick up users added to mem0 since the last sync
+        if st.button("🔄 Refresh User List", help="Load new users from database"):
+            added = user_index.refresh()
+            st.toast(f"Found {added} new users" if added else "User list is up to date")
         
         if st.session_state.registered_users:
             st.subheader("📝 Your Registered Profiles")
             for name in st.session_state.registered_users:
-                if st.button(f"✅ {name}", key=f"reg_btn_{name}", use_container_width=True):
-                    st.session_state.user_id = name
-                    st.session_state.name_entered = True
-                    st.session_state.user_exists = True
-                    st.session_state.onboarding_complete = True
-                    st.session_state.show_names = False
-                    st.rerun()
+                st.button(f"✅ {name}", key=f"reg_btn_{name}", use_container_width=True,
+                          on_click=select_profile, args=(name,))
             
             st.markdown("---")
         
-        if existing_users:
+        if len(user_index):
             st.subheader("👥 Existing Users")
-            st.caption(f"Found {len(existing_users)} users in database")
+            st.text_input("Search profiles", key="directory_query", placeholder="Type a name...",
+                          on_change=on_directory_search)
             
-            # Calculate midpoint for two columns
-            midpoint = len(existing_users) // 2 if len(existing_users) > 1 else 1
+            # Only render one page of matches rather than a button per user
+            offset = st.session_state.directory_page * DIRECTORY_PAGE_SIZE
+            names, total = user_index.search(st.session_state.directory_query, offset, DIRECTORY_PAGE_SIZE)
+            st.caption(f"{total} of {len(user_index)} users match")
             
-            if len(existing_users) > 10:  # If many users, show in two columns
-                col1, col2 = st.columns(2)
-                
+            for name in names:
+                st.button(name, key=f"btn_{name}", use_container_width=True,
+                          on_click=select_profile, args=(name,))
+            
+            if total > DIRECTORY_PAGE_SIZE:
+                last_page = (total - 1) // DIRECTORY_PAGE_SIZE
+                col1, col2, col3 = st.columns([1, 2, 1])
                 with col1:
-                    for name in existing_users[:midpoint]:
-                        if st.button(name, key=f"btn_{name}", use_container_width=True):
-                            st.session_state.user_id = name
-                            st.session_state.name_entered = True
-                            st.session_state.user_exists = True
-                            st.session_state.onboarding_complete = True
-                            st.session_state.show_names = False
-                            st.rerun()
-                
+                    if st.button("◀", disabled=st.session_state.directory_page == 0):
+                        st.session_state.directory_page -= 1
+                        st.rerun()
                 with col2:
-                    for name in existing_users[midpoint:]:
-                        if st.button(name, key=f"btn_{name}", use_container_width=True):
-                            st.session_state.user_id = name
-                            st.session_state.name_entered = True
-                            st.session_state.user_exists = True
-                            st.session_state.onboarding_complete = True
-                            st.session_state.show_names = False
-                            st.rerun()
-            else:  # If few users, show in single column
-                for name in existing_users:
-                    if st.button(name, key=f"btn_{name}", use_container_width=True):
-                        st.session_state.user_id = name
-                        st.session_state.name_entered = True
-                        st.session_state.user_exists = True
-                        st.session_state.onboarding_complete = True
-                        st.session_state.show_names = False
+                    st.caption(f"Page {st.session_state.directory_page + 1} of {last_page + 1}")
+                with col3:
+                    if st.button("▶", disabled=st.session_state.directory_page >= last_page):
+                        st.session_state.directory_page += 1
                         st.rerun()
         else:
             st.info("No existing users found in database.")
@@ -387,7 +219,7 @@ if not st.session_state.name_entered:
                 st.session_state.submit_clicked = False
                 
                 # Check if user exists in mem0
-                st.session_state.user_exists = check_user_exists(formatted_name)
+                st.session_state.user_exists = advisor.check_user_exists(formatted_name)
                 
                 if st.session_state.user_exists:
                     st.session_state.onboarding_complete = True
@@ -412,13 +244,20 @@ elif st.session_state.name_entered:
             if st.button("Let's get started! 🚀"):
                 st.session_state.onboarding_started = True
                 # Initialize conversation with first onboarding message
-                first_response = get_onboarding_response([{"role": "user", "content": "I'm ready to get started with the onboarding process."}])
+                first_response = advisor.start_onboarding(
+                    st.session_state.user_id,
+                    render=stream_to(st.empty(), "**CareerCoach AI:** {}") if STREAM_RESPONSES else None,
+                    tracker=st.session_state.slot_tracker
+                )
                 st.session_state.conversation_history.append({"role": "assistant", "content": first_response})
                 st.rerun()
         
         else:
             # Show onboarding conversation
             st.markdown("### Profile Setup")
+            if st.session_state.slot_tracker is not None:
+                coverage = st.session_state.slot_tracker.coverage()
+                st.progress(coverage, text=f"Profile {coverage:.0%} complete")
             
             # Display conversation history
             for i, message in enumerate(st.session_state.conversation_history):
@@ -433,21 +272,25 @@ elif st.session_state.name_entered:
             
             if st.button("Send Response"):
                 if user_input:
-                    # Add user message to conversation
-                    st.session_state.conversation_history.append({"role": "user", "content": user_input})
-                    
-                    # Get AI response
-                    ai_response = get_onboarding_response(st.session_state.conversation_history)
+                    render = None
+                    if STREAM_RESPONSES:
+                        st.markdown(f"**You:** {user_input}")
+                        render = stream_to(st.empty(), "**CareerCoach AI:** {}")
                     
-                    # Add AI response to conversation
-                    st.session_state.conversation_history.append({"role": "assistant", "content": ai_response})
-                    
-                    # Store the conversation turn in mem0
-                    add_memory_from_conversation(user_input, ai_response, st.session_state.user_id)
+                    # Get AI response, record both messages and queue the turn for mem0
+                    turn = advisor.onboarding_turn(
+                        st.session_state.user_id,
+                        st.session_state.conversation_history,
+                        user_input,
+                        window=st.session_state.onboarding_window,
+                        render=render,
+                        tracker=st.session_state.slot_tracker
+                    )
                     
                     # Check if onboarding is complete
-                    if "now have all the information I need" in ai_response.lower() or "you can now ask me" in ai_response.lower():
+                    if turn["complete"]:
                         st.session_state.onboarding_complete = True
+                        st.session_state.onboarding_report = turn.get("report")
                         # Add user to registered users list
                         if st.session_state.user_id not in st.session_state.registered_users:
                             st.session_state.registered_users.append(st.session_state.user_id)
@@ -458,6 +301,12 @@ elif st.session_state.name_entered:
     else:
         st.write(f"Hello, **{st.session_state.user_id}**! How can I help with your career today?")
         
+        report = st.session_state.onboarding_report
+        if report and report["complete"]:
+            st.caption(f"Profile setup finished in {report['turns']} answers "
+                       f"({report['turns_saved']} fewer than a typical interview, "
+                       f"~{report['tokens_saved']} prompt tokens saved).")
+        
         # Provide example queries
         with st.expander("Example questions you can ask"):
             st.markdown("""
@@ -479,23 +328,67 @@ elif st.session_state.name_entered:
         if st.session_state.query:
             st.session_state.query = ""
         
+        fresh_answer = advisor.response_cache is not None and st.checkbox(
+            "Generate a fresh answer", help="Skip the saved answer for this question and ask the AI again")
+        
         if st.button("Get Response"):
-            if query:
+            # Simple factual lookups are answered straight from the structured profile
+            profile_answer = advisor.answer_from_profile(st.session_state.user_id, query)
+            
+            if profile_answer:
+                st.markdown("## Your Answer")
+                st.markdown(ANSWER_HTML.format(profile_answer), unsafe_allow_html=True)
+                st.caption("Answered instantly from your saved profile.")
+            elif query:
                 with st.spinner("Searching for your profile information..."):
-                    memory_results = search_memory(query, st.session_state.user_id)
+                    memory_results = advisor.retrieve_memory(query, st.session_state.user_id,
+                                                             st.session_state.working_set)
                 
                 if memory_results:
                     st.success("Profile information found!")
                     
                     with st.expander("View your profile information", expanded=False):
                         st.json(memory_results)
+                        cache_stats = advisor.search_cache.stats()
+                        st.caption(f"Memory search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+                    
+                    # Same question over the same memories: reuse the saved answer
+                    cache_key = advisor.advice_cache_key(st.session_state.user_id, memory_results, query)
+                    cached_response = None if fresh_answer else advisor.cached_advice(cache_key)
+                    
+                    if cached_response is not None:
+                        st.markdown("## Your Answer")
+                        st.markdown(ANSWER_HTML.format(cached_response), unsafe_allow_html=True)
+                        response_stats = advisor.response_cache.stats()
+                        st.caption(f"Saved answer for your current profile "
+                                   f"(response cache hit rate {response_stats['hit_rate']:.0%}).")
+                    else:
+                        messages, context_report = advisor.prepare_advice(memory_results, query,
+                                                                          working_set=st.session_state.working_set)
                     
-                    with st.spinner("Analyzing your career situation..."):
-                        response = get_chatgpt_response(memory_results, query)
+                        if STREAM_RESPONSES:
+                            st.markdown("## Your Answer")
+                            timing = {}
+                            response = advisor.complete_advice(messages, render=stream_to(st.empty(), ANSWER_HTML, True, timing), cache_key=cache_key, query=query)
+                            if "ttft" in timing:
+                                ttft = first_token_log.summary("advice")
+                                st.caption(f"Time to first token: {timing['ttft']:.2f}s (avg {ttft['mean']:.2f}s)")
+                        else:
+                            with st.spinner("Analyzing your career situation..."):
+                                response = advisor.complete_advice(messages, cache_key=cache_key, query=query)
+                        
+                            st.markdown("## Your Answer")
+                            st.markdown(ANSWER_HTML.format(response), unsafe_allow_html=True)
                     
-                    st.markdown("## Your Answer")
-                    st.markdown(f"<div style='background-color:#393E46; padding:20px; border-radius:10px; color:white;'>{response}</div>", 
-                                unsafe_allow_html=True)
+                        if context_report:
+                            st.caption(f"Profile context: {context_report['memories_kept']} memories, "
+                                       f"~{context_report['context_tokens']} tokens "
+                                       f"({context_report['tokens_saved']} saved vs. raw payload)")
+                            session = context_report.get("working_set")
+                            if session and session["questions"] > 1:
+                                st.caption(f"Session memory: {session['memories']} memories carried over "
+                                           f"{session['questions']} questions, {session['memories_reused']} reused "
+                                           f"instead of fetched again.")
                 else:
                     st.error("I couldn't find your profile information. This might be a technical issue - please try again.")
             else:
@@ -508,6 +401,23 @@ elif st.session_state.name_entered:
                   help="Click to re-enter your name", 
                   on_click=on_reset_name)
 
+# Admin panel with external call latencies, token usage and spend
+if ADMIN_PANEL:
+    with st.sidebar:
+        with st.expander("📊 Performance", expanded=False):
+            summary = metrics.summary()
+            if summary["calls"]:
+                st.dataframe(summary["calls"], hide_index=True, use_container_width=True)
+            else:
+                st.caption("No external calls recorded yet.")
+            if summary["tiers"]:
+                st.dataframe(summary["tiers"], hide_index=True, use_container_width=True)
+            total_cost = sum(row["usd"] for row in summary["cost"])
+            total_tokens = sum(row["tokens"] for row in summary["tokens"] if row["type"] != "cached_prompt")
+            st.caption(f"{total_tokens} tokens, ~${total_cost:.4f} estimated spend")
+            st.download_button("Prometheus metrics", metrics.to_prometheus(), file_name="metrics.txt")
+            st.download_button("JSON dump", metrics.to_json(), file_name="metrics.json")
+
 # Footer
 st.markdown("---")
 st.caption("CareerCoach AI uses mem0 for secure profile storage and OpenAI for personalized career insights.")
\ No newline at end of file
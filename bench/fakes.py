@@ -0,0 +1,338 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from advisor_service import ONBOARDING_SUMMARY_ROLE, PROFILE_EXTRACTION_ROLE, ONBOARDING_SYSTEM_ROLE
+from onboarding_slots import SLOT_EXTRACTION_ROLE
+from context_builder import estimate_tokens
+from onboarding_window import keyword_summarize
+from profile_categories import split_sentences
+from profile_store import extract_profile_facts, merge_profile, empty_profile
+from resilience import current_session
+
+# Phrase synthetic users send when they have nothing more to add
+FINISHED_PHRASE = "that's everything i can share"
+
+COMPLETION_MESSAGE = ("Perfect! I now have all the information I need to provide you with personalized "
+                      "career advice. You can now ask me any career-related questions!")
+
+FILLER_WORDS = ("career", "experience", "skills", "role", "growth", "industry", "project", "team",
+                "certification", "timeline", "opportunity", "goals", "plan", "next", "steps")
+
+# Provider prompt caching: prompts from this size are cached, matched in fixed-size blocks of tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_BLOCK_TOKENS = 128
+
+# Latency multiplier per model relative to the configured LLM latency
+MODEL_SPEED = {"gpt-4.1-nano": 0.5, "gpt-4.1-mini": 0.8, "gpt-4o-mini": 1.0, "gpt-4o": 1.6}
+
+
+# Patterns for the synthetic users' answers, standing in for the model's structured extraction
+SLOT_PATTERNS = (
+    (r"my name is ([A-Z][a-z]+ [A-Z][a-z]+)", "personal", "full_name"),
+    (r"\blive in ([A-Z][a-z]+)", "personal", "location"),
+    (r"work as an? (.+?) at ", "current_job", "role"),
+    (r" at (Company\d+)", "current_job", "company"),
+    (r"\b(full-time|part-time|freelance)\b", "current_job", "employment_type"),
+    (r"work (remote|hybrid|onsite)", "current_job", "work_setting"),
+    (r"proficient with (.+?)\.", "skills", "technical_skills"),
+    (r"hold an? (.+?)\.", "skills", "certifications"),
+    (r"years as an? (.+?) where", "experience", "previous_roles"),
+    (r"move into an? (.+?) role", "aspirations", "desired_role"),
+    (r"relocate to ([A-Z][a-z]+)", "relocation", "preferred_locations"),
+    (r"contract ends on ([A-Z][a-z]+ \d{4})", "timeline", "contract_end_date"),
+    (r"certification within (\d+ months)", "timeline", "certification_completion"),
+)
+LIST_SLOTS = ("technical_skills", "certifications", "previous_roles", "preferred_locations")
+
+
+def fake_extract_slots(answer):
+    """Slot values the structured-output extractor would return for a synthetic answer"""
+    slots = extract_profile_facts(answer)
+    for pattern, section, field in SLOT_PATTERNS:
+        match = re.search(pattern, answer, re.I)
+        if match:
+            value = match.group(1)
+            if field in LIST_SLOTS:
+                value = [v.strip() for v in re.split(r",| and ", value) if v.strip()]
+            slots.setdefault(section, {})[field] = value
+    return slots
+
+
+class LatencyModel:
+    """Log-normally distributed latency around a mean, scaled for faster-than-real-time runs"""
+
+    def __init__(self, mean_ms, jitter=0.3, time_scale=1.0, rng=None):
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def sample(self):
+        if self.mean_ms <= 0:
+            return 0.0
+        with self._lock:
+            factor = self.rng.lognormvariate(-self.jitter ** 2 / 2, self.jitter) if self.jitter else 1.0
+        return self.mean_ms * factor / 1000.0
+
+    def sleep(self, scale=1.0):
+        seconds = self.sample() * self.time_scale * scale
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FakeServiceError(Exception):
+    """Transient upstream failure, shaped like an SDK error carrying an HTTP status"""
+
+    def __init__(self, status_code=503):
+        super().__init__(f"simulated upstream error ({status_code})")
+        self.status_code = status_code
+
+
+class FakeMem0Error(Exception):
+    """Shaped like mem0's APIError: a message only, raised while handling the HTTP error"""
+
+
+class Truncated(str):
+    """Completion text cut off at `max_tokens`, reported with the "length" finish reason"""
+
+
+class FaultModel:
+    """Raises FakeServiceError for a fraction of calls, or `wrap` raised from it like the mem0 SDK does"""
+
+    def __init__(self, error_rate=0.0, rng=None, wrap=None):
+        self.error_rate = error_rate
+        self.rng = rng or random.Random()
+        self.wrap = wrap
+        self._lock = threading.Lock()
+
+    def maybe_fail(self):
+        if self.error_rate <= 0:
+            return
+        with self._lock:
+            failed = self.rng.random() < self.error_rate
+            status = self.rng.choice((429, 503))
+        if not failed:
+            return
+        if self.wrap is None:
+            raise FakeServiceError(status)
+        try:
+            raise FakeServiceError(status)
+        except FakeServiceError as e:
+            raise self.wrap(f"API request failed: {e}")
+
+
+class FakeMemoryClient:
+    """Stand-in for mem0.MemoryClient with configurable per-operation latency.
+
+    Stores every user sentence as a memory and ranks memories for a query by
+    word overlap, returning records shaped like mem0 search results.
+    """
+
+    def __init__(self, search_latency, add_latency, users_latency, faults=None):
+        self.search_latency = search_latency
+        self.add_latency = add_latency
+        self.users_latency = users_latency
+        self.faults = faults or FaultModel()
+        self._memories = {}
+        self._lock = threading.Lock()
+
+    def add(self, messages, user_id, **kwargs):
+        self.add_latency.sleep()
+        self.faults.maybe_fail()
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        added = []
+        with self._lock:
+            memories = self._memories.setdefault(user_id, [])
+            for message in messages:
+                if message.get("role") != "user":
+                    continue
+                for sentence in split_sentences(message["content"]):
+                    record = {"id": str(uuid.uuid4()), "memory": sentence, "user_id": user_id,
+                              "created_at": now, "updated_at": now, "metadata": None, "categories": []}
+                    memories.append(record)
+                    added.append({"id": record["id"], "memory": sentence, "event": "ADD"})
+        return {"results": added}
+
+    def search(self, query, user_id, **kwargs):
+        self.search_latency.sleep()
+        self.faults.maybe_fail()
+        limit = kwargs.get("top_k") or kwargs.get("limit") or 10
+        words = set(re.findall(r"[a-z0-9]+", query.lower()))
+        with self._lock:
+            memories = list(self._memories.get(user_id, []))
+        scored = []
+        for record in memories:
+            memory_words = set(re.findall(r"[a-z0-9]+", record["memory"].lower()))
+            overlap = len(words & memory_words) / (len(words | memory_words) or 1)
+            scored.append(dict(record, score=round(0.3 + overlap, 4)))
+        scored.sort(key=lambda r: r["score"], reverse=True)
+        return scored[:limit]
+
+    def users(self, page=None, page_size=None, **kwargs):
+        self.users_latency.sleep()
+        self.faults.maybe_fail()
+        with self._lock:
+            names = sorted(self._memories)
+        start = (page - 1) * page_size if page and page_size else 0
+        end = start + page_size if page and page_size else len(names)
+        return {"count": len(names), "results": [{"name": n, "type": "user"} for n in names[start:end]],
+                "next": end < len(names)}
+
+    def get_all(self, user_id, **kwargs):
+        self.users_latency.sleep()
+        self.faults.maybe_fail()
+        with self._lock:
+            return [dict(record) for record in self._memories.get(user_id, [])]
+
+    def _find(self, memory_id, user_id):
+        for index, record in enumerate(self._memories.get(user_id, [])):
+            if record["id"] == memory_id:
+                return index
+        raise KeyError(memory_id)
+
+    def update(self, memory_id, text, user_id=None, **kwargs):
+        self.add_latency.sleep()
+        self.faults.maybe_fail()
+        with self._lock:
+            record = self._memories[user_id][self._find(memory_id, user_id)]
+            record.update(memory=text, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        return {"id": memory_id, "memory": text, "event": "UPDATE"}
+
+    def delete(self, memory_id, user_id=None, **kwargs):
+        self.users_latency.sleep()
+        self.faults.maybe_fail()
+        with self._lock:
+            del self._memories[user_id][self._find(memory_id, user_id)]
+        return {"id": memory_id, "event": "DELETE"}
+
+
+class _FakeCompletions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, messages, stream=False, response_format=None, stream_options=None, **kwargs):
+        return self.owner.complete(model, messages, stream, response_format, stream_options, **kwargs)
+
+
+class FakeOpenAI:
+    """Stand-in for openai.OpenAI chat completions with configurable latency and output length.
+
+    Onboarding prompts get a follow-up question until the user sends
+    FINISHED_PHRASE, JSON-mode summary and profile prompts are answered with
+    the local keyword/regex extractors, and everything else gets filler text
+    of a sampled length, cut off at `max_tokens` when given. Latency is
+    scaled per model by `model_speed`. Usage is reported like the real API,
+    including the prompt tokens a provider-side prompt cache would have served.
+    Onboarding reply prompt sizes are kept per session in `onboarding_prompts`.
+    """
+
+    def __init__(self, latency, ttft, per_token_ms=0.0, completion_tokens=(180, 60), rng=None, time_scale=1.0,
+                 faults=None, model_speed=None):
+        self.latency = latency
+        self.ttft = ttft
+        self.per_token_ms = per_token_ms
+        self.completion_tokens = completion_tokens
+        self.model_speed = MODEL_SPEED if model_speed is None else model_speed
+        self.rng = rng or random.Random()
+        self.time_scale = time_scale
+        self.faults = faults or FaultModel()
+        self.calls = 0
+        self.onboarding_prompts = {}
+        self._lock = threading.Lock()
+        self._prompt_prefixes = OrderedDict()
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    def _cached_tokens(self, model, messages, prompt_tokens, max_prefixes=50000):
+        """Longest block-aligned prompt prefix seen before, like automatic provider prompt caching"""
+        if prompt_tokens < PROMPT_CACHE_MIN_TOKENS:
+            return 0
+        text = "\x1e".join(f"{m['role']}:{m['content']}" for m in messages)
+        cached = 0
+        with self._lock:
+            # Blocks are cut at about four characters per token
+            for boundary in range(PROMPT_CACHE_MIN_TOKENS, min(prompt_tokens, len(text) // 4) + 1,
+                                  PROMPT_CACHE_BLOCK_TOKENS):
+                key = (model, hash(text[:boundary * 4]))
+                if key in self._prompt_prefixes:
+                    self._prompt_prefixes.move_to_end(key)
+                    cached = boundary
+                else:
+                    self._prompt_prefixes[key] = True
+            while len(self._prompt_prefixes) > max_prefixes:
+                self._prompt_prefixes.popitem(last=False)
+        return cached
+
+    def _filler(self, prefix, max_tokens=None):
+        mean, spread = self.completion_tokens
+        with self._lock:
+            target = max(5, int(self.rng.gauss(mean, spread)))
+            words = [self.rng.choice(FILLER_WORDS) for _ in range(target)]
+        text = prefix + " " + " ".join(words) + "."
+        if max_tokens and estimate_tokens(text) > max_tokens:
+            # Cut off at the budget like a response stopped for length
+            text = Truncated(text[:max_tokens * len(text) // estimate_tokens(text)].rsplit(" ", 1)[0])
+        return text
+
+    def _content(self, messages, response_format, max_tokens=None):
+        system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        if response_format and response_format.get("type") == "json_object":
+            payload = messages[-1]["content"]
+            if system == ONBOARDING_SUMMARY_ROLE:
+                data = json.loads(payload)
+                return json.dumps(keyword_summarize(data["summary"], data["new_turns"]))
+            if system == SLOT_EXTRACTION_ROLE:
+                return json.dumps(fake_extract_slots(json.loads(payload)["answer"]))
+            if system == PROFILE_EXTRACTION_ROLE:
+                profile = empty_profile()
+                for line in payload.splitlines():
+                    if line.startswith("user: "):
+                        merge_profile(profile, extract_profile_facts(line[len("user: "):]))
+                return json.dumps(profile)
+            return "{}"
+        if system == ONBOARDING_SYSTEM_ROLE:
+            last_user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+            if FINISHED_PHRASE in last_user.lower():
+                return COMPLETION_MESSAGE
+            return self._filler("Thanks for sharing! Could you tell me more about your", max_tokens)
+        return self._filler("Here is my advice:", max_tokens)
+
+    def complete(self, model, messages, stream, response_format, stream_options, **kwargs):
+        with self._lock:
+            self.calls += 1
+        self.faults.maybe_fail()
+        content = self._content(messages, response_format, kwargs.get("max_tokens"))
+        speed = self.model_speed.get(model, 1.0)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        if messages and messages[0]["content"] == ONBOARDING_SYSTEM_ROLE:
+            with self._lock:
+                self.onboarding_prompts.setdefault(current_session.get(), []).append(prompt_tokens)
+        details = SimpleNamespace(cached_tokens=self._cached_tokens(model, messages, prompt_tokens))
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=estimate_tokens(content),
+                                total_tokens=prompt_tokens + estimate_tokens(content), prompt_tokens_details=details)
+        finish_reason = "length" if isinstance(content, Truncated) else "stop"
+        if stream:
+            return self._stream(content, usage, bool(stream_options and stream_options.get("include_usage")), speed,
+                                finish_reason)
+        self.latency.sleep(speed)
+        message = SimpleNamespace(role="assistant", content=str(content))
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+                               usage=usage, model=model)
+
+    def _stream(self, content, usage, include_usage, speed=1.0, finish_reason="stop"):
+        self.ttft.sleep(speed)
+        for word in re.findall(r"\S+\s*", content):
+            if self.per_token_ms:
+                time.sleep(self.per_token_ms * self.time_scale * speed / 1000.0)
+            delta = SimpleNamespace(content=word)
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)], usage=None)
+        delta = SimpleNamespace(content=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)], usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=usage)
@@ -0,0 +1,337 @@
+"""Replay synthetic users through the advisor against fake mem0 and OpenAI backends.
+
+Each synthetic user enters their name (existence check), completes a
+multi-turn onboarding interview and then asks a round of advice questions,
+exercising the same AdvisorService code paths as the Streamlit app. The run
+reports throughput, per-stage latency percentiles, external call counts and
+token usage, so results can be compared before and after a change:
+
+    python -m bench.run --users 50 --concurrency 8 --json before.json
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from advisor_service import AdvisorService, format_name, is_full_name
+from bench.fakes import FakeMemoryClient, FakeMem0Error, FakeOpenAI, LatencyModel, FaultModel
+from bench.users import synthetic_user, profile_updates
+from memory_cache import SearchCache
+from memory_consolidation import consolidate_user
+from memory_writer import MemoryWriteQueue
+from metrics import metrics, percentile, InstrumentedMemory, InstrumentedOpenAI
+from model_router import ModelRouter, DEFAULT_TIERS, parse_tier
+from onboarding_slots import SlotTracker
+from onboarding_window import OnboardingWindow
+from profile_store import ProfileStore
+from response_cache import ResponseCache
+from resilience import (ResiliencePolicy, RateLimiter, CircuitBreaker, RetryPolicy,
+                        ResilientMemory, ResilientOpenAI, current_session)
+from retrieval import CATEGORY_QUERIES
+from user_index import UserIndex, fetch_user_names
+from working_set import WorkingSet
+
+
+class StageTimer:
+    """Thread-safe collection of per-stage latencies"""
+
+    def __init__(self):
+        self.samples = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        with self._lock:
+            return {
+                stage: {
+                    "count": len(values),
+                    "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                    "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                    "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                    "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                }
+                for stage, values in sorted(self.samples.items())
+            }
+
+
+def build_advisor(args, workdir):
+    """Wire the real app components to fake mem0 and OpenAI backends"""
+    rng = random.Random(args.seed)
+
+    def latency(mean_ms):
+        return LatencyModel(mean_ms, args.jitter, args.time_scale, random.Random(rng.random()))
+
+    def policy(name, rate):
+        # Rates are real-time requests per second, so they scale with the simulated latencies
+        return ResiliencePolicy(
+            name,
+            limiter=RateLimiter(rate / args.time_scale) if rate > 0 else None,
+            breaker=CircuitBreaker(name, failure_threshold=args.breaker_threshold, reset_timeout=30 * args.time_scale),
+            retry=RetryPolicy(max_retries=args.max_retries, base_delay=0.5 * args.time_scale,
+                              max_delay=8 * args.time_scale, rng=random.Random(rng.random()))
+        )
+
+    memory_policy, llm_policy = policy("mem0", args.memory_rate), policy("openai", args.llm_rate)
+    memory = InstrumentedMemory(ResilientMemory(
+        FakeMemoryClient(latency(args.search_ms), latency(args.add_ms), latency(args.users_ms),
+                         FaultModel(args.error_rate, random.Random(rng.random()), wrap=FakeMem0Error)),
+        memory_policy))
+    fake_llm = FakeOpenAI(latency(args.llm_ms), latency(args.ttft_ms), args.token_ms,
+                          (args.completion_tokens, args.completion_tokens_sd),
+                          random.Random(rng.random()), args.time_scale,
+                          FaultModel(args.error_rate, random.Random(rng.random())))
+    llm = InstrumentedOpenAI(ResilientOpenAI(fake_llm, llm_policy))
+    metrics.add_collector(memory_policy.metric_samples)
+    metrics.add_collector(llm_policy.metric_samples)
+    search_cache = SearchCache(max_size=args.cache_size, ttl=600) if args.cache_size > 0 else None
+    user_index = UserIndex(lambda: memory.bound("directory"), resync_interval=0).start()
+    write_queue = MemoryWriteQueue(
+        lambda: memory.bound("onboarding"),
+        flush_interval=args.flush_interval,
+        max_batch_turns=args.batch_turns,
+        max_retries=0,
+        on_written=search_cache.invalidate_user if search_cache else None
+    )
+    advisor = AdvisorService(
+        memory, llm,
+        search_cache=search_cache,
+        profile_store=ProfileStore(workdir) if not args.no_profile else None,
+        user_index=user_index,
+        write_queue=write_queue,
+        response_cache=ResponseCache(os.path.join(workdir, "responses.sqlite3"), max_entries=args.response_cache_size)
+        if args.response_cache_size > 0 else None,
+        model=args.model,
+        context_token_budget=args.context_budget,
+        retrieval_fanout=not args.no_fanout,
+        followup_top_k=args.followup_top_k,
+        router=None if args.no_router else ModelRouter(tiers_from_args(args))
+    )
+    return advisor, write_queue, fake_llm
+
+
+def tiers_from_args(args):
+    """Default tier table with --tier NAME=model:max_tokens overrides"""
+    tiers = dict(DEFAULT_TIERS)
+    for spec in args.tier:
+        name, _, value = spec.partition("=")
+        tiers[name] = parse_tier(value, tiers.get(name, DEFAULT_TIERS["standard"]))
+    return tiers
+
+
+def replay_user(advisor, index, args, timer):
+    """Drive one synthetic user through name entry, onboarding and advice"""
+    rng = random.Random(args.seed * 100003 + index)
+    raw_name, answers, queries = synthetic_user(index, rng, args.onboarding_turns)
+    current_session.set(f"bench-{index}")
+    render = (lambda chunks: "".join(chunks)) if args.stream else None
+
+    start = time.perf_counter()
+    user_id = format_name(raw_name)
+    exists = is_full_name(user_id) and advisor.check_user_exists(user_id)
+    timer.record("name_entry", time.perf_counter() - start)
+
+    if not exists:
+        history = []
+        window = OnboardingWindow(keep_turns=args.window_turns) if args.window_turns > 0 else None
+        tracker = SlotTracker(baseline_turns=args.onboarding_turns) if args.slots else None
+        start = time.perf_counter()
+        history.append({"role": "assistant", "content": advisor.start_onboarding(user_id, render=render, tracker=tracker)})
+        timer.record("onboarding_start", time.perf_counter() - start)
+        for answer in answers:
+            start = time.perf_counter()
+            turn = advisor.onboarding_turn(user_id, history, answer, window=window, render=render, tracker=tracker)
+            timer.record("onboarding_finish" if turn["complete"] else "onboarding_turn", time.perf_counter() - start)
+            timer.count("onboarding_turns")
+            if turn["complete"]:
+                timer.count("onboarding_completed")
+                if turn.get("report"):
+                    timer.count("slots_turns_saved", turn["report"]["turns_saved"])
+                    timer.count("slots_tokens_saved", turn["report"]["tokens_saved"])
+                    timer.count("slots_llm_calls_saved", turn["report"]["llm_calls_saved"])
+                break
+
+    for update in profile_updates(rng, args.profile_updates):
+        advisor.add_memory_from_conversation(update, "Thanks, I've noted that.", user_id, background=True)
+
+    working_set = None if args.no_working_set else WorkingSet(token_budget=args.context_budget)
+    for _ in range(args.advice_rounds):
+        for query in queries:
+            start = time.perf_counter()
+            result = advisor.advise(user_id, query, render=render, working_set=working_set)
+            timer.record("advice", time.perf_counter() - start)
+            timer.record(f"advice_{result['source']}", time.perf_counter() - start)
+            timer.count(f"advice_source_{result['source']}")
+    if working_set is not None:
+        session = working_set.report()
+        timer.count("working_set_memories_reused", session["memories_reused"])
+        timer.count("working_set_stable_prefix_tokens", session["stable_prefix_tokens"])
+
+
+def consolidate_all(advisor):
+    """Consolidate every replayed user's memories and total the before/after report"""
+    client = advisor.memory_client.bound("consolidation")
+    current_session.set("bench-consolidation")
+    totals = {}
+    for user_id in fetch_user_names(client):
+        report = consolidate_user(client, user_id, probe_queries=list(CATEGORY_QUERIES.values()))
+        for key, value in report.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run(args):
+    metrics.reset()
+    timer = StageTimer()
+    consolidation = None
+    with tempfile.TemporaryDirectory() as workdir:
+        advisor, write_queue, fake_llm = build_advisor(args, workdir)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(lambda i: replay_user(advisor, i, args, timer), range(args.users)))
+        write_queue.close()
+        wall = time.perf_counter() - start
+        if args.consolidate:
+            consolidation = consolidate_all(advisor)
+
+    summary = metrics.summary()
+    stages = timer.summary()
+    requests = sum(stage["count"] for name, stage in stages.items()
+                   if name in ("name_entry", "onboarding_start", "onboarding_turn", "onboarding_finish", "advice"))
+    calls = {}
+    for call in summary["calls"]:
+        calls[call["operation"]] = calls.get(call["operation"], 0) + call["count"]
+    # Largest onboarding reply prompt at each turn across users; it should plateau once the window folds
+    onboarding_turns = list(fake_llm.onboarding_prompts.values())
+    by_turn = [max(prompts[turn] for prompts in onboarding_turns if len(prompts) > turn)
+               for turn in range(max(map(len, onboarding_turns), default=0))]
+    prompt_tokens = {}
+    for row in summary["tokens"]:
+        if row["type"] == "prompt":
+            prompt_tokens[row["flow"]] = prompt_tokens.get(row["flow"], 0) + row["tokens"]
+    return {
+        "config": vars(args),
+        "wall_seconds": round(wall, 3),
+        "throughput": {
+            "users_per_second": round(args.users / wall, 3),
+            "requests_per_second": round(requests / wall, 3),
+        },
+        "stages": stages,
+        "counters": timer.counters,
+        "external_calls": calls,
+        "external_latency": summary["calls"],
+        "prompt_tokens": prompt_tokens,
+        "onboarding_prompt_tokens": {"max": max(by_turn, default=0), "by_turn": by_turn},
+        "completion_tokens": sum(row["tokens"] for row in summary["tokens"] if row["type"] == "completion"),
+        "cached_prompt_tokens": sum(row["tokens"] for row in summary["tokens"] if row["type"] == "cached_prompt"),
+        "estimated_cost_usd": round(sum(row["usd"] for row in summary["cost"]), 6),
+        "tiers": summary["tiers"],
+        "consolidation": consolidation,
+        "resilience": {
+            f"{g['labels']['service']}.{g['labels'].get('result', g['name'].replace('careercoach_', ''))}": g["value"]
+            for g in summary["gauges"] if "service" in g["labels"]
+        },
+    }
+
+
+def print_report(report):
+    print(f"wall time {report['wall_seconds']}s  "
+          f"{report['throughput']['users_per_second']} users/s  "
+          f"{report['throughput']['requests_per_second']} requests/s")
+    print(f"\n{'stage':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for stage, row in report["stages"].items():
+        print(f"{stage:<22}{row['count']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['mean_ms']:>10}")
+    print(f"\n{'external call':<22}{'flow':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in report["external_latency"]:
+        print(f"{row['operation']:<22}{row['flow']:<12}{row['count']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+    print(f"\nexternal calls: {report['external_calls']}")
+    print(f"prompt tokens: {report['prompt_tokens']} (total {sum(report['prompt_tokens'].values())}, "
+          f"{report['cached_prompt_tokens']} from the provider prompt cache)")
+    print(f"completion tokens: {report['completion_tokens']}  estimated cost: ${report['estimated_cost_usd']}")
+    print(f"onboarding prompt tokens by turn (max over users): {report['onboarding_prompt_tokens']['by_turn']}")
+    if report["tiers"]:
+        print(f"\n{'model tier':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'tokens out':>12}{'usd':>12}")
+        for row in report["tiers"]:
+            print(f"{row['tier']:<22}{row['count']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+                  f"{row['completion_tokens']:>12}{row['usd']:>12}")
+    if report["consolidation"]:
+        print(f"consolidation: {report['consolidation']}")
+    print(f"resilience: {report['resilience']}")
+    print(f"counters: {report['counters']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="synthetic users to replay")
+    parser.add_argument("--concurrency", type=int, default=4, help="users replayed in parallel")
+    parser.add_argument("--onboarding-turns", type=int, default=7, help="answers per onboarding interview")
+    parser.add_argument("--advice-rounds", type=int, default=1, help="times each user asks the example questions")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="multiplier on simulated latencies (1.0 = real time)")
+    parser.add_argument("--jitter", type=float, default=0.35, help="log-normal sigma for latencies")
+    parser.add_argument("--search-ms", type=float, default=350)
+    parser.add_argument("--add-ms", type=float, default=900)
+    parser.add_argument("--users-ms", type=float, default=400)
+    parser.add_argument("--llm-ms", type=float, default=2500, help="non-streamed completion latency")
+    parser.add_argument("--ttft-ms", type=float, default=600, help="streamed time to first token")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="streamed inter-token delay")
+    parser.add_argument("--completion-tokens", type=int, default=180)
+    parser.add_argument("--completion-tokens-sd", type=int, default=60)
+    parser.add_argument("--stream", action="store_true", help="stream completions like the app does")
+    parser.add_argument("--window-turns", type=int, default=4, help="onboarding window (0 sends full history)")
+    parser.add_argument("--context-budget", type=int, default=600, help="advice context token budget")
+    parser.add_argument("--cache-size", type=int, default=512, help="search cache entries (0 disables)")
+    parser.add_argument("--response-cache-size", type=int, default=5000, help="saved answers (0 disables)")
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--batch-turns", type=int, default=6)
+    parser.add_argument("--no-profile", action="store_true", help="disable the structured profile fast path")
+    parser.add_argument("--slots", action="store_true", help="track onboarding coverage and end interviews once it is met")
+    parser.add_argument("--no-fanout", action="store_true", help="answer advice from a single memory search")
+    parser.add_argument("--no-router", action="store_true", help="send every LLM call to --model")
+    parser.add_argument("--no-working-set", action="store_true", help="retrieve every advice question from scratch")
+    parser.add_argument("--followup-top-k", type=int, default=3, help="memories fetched for a follow-up question")
+    parser.add_argument("--profile-updates", type=int, default=0,
+                        help="later salary updates and restated facts stored per user after onboarding")
+    parser.add_argument("--consolidate", action="store_true", help="consolidate every user's memories after the run")
+    parser.add_argument("--model", default="gpt-4o-mini", help="model used without the router")
+    parser.add_argument("--tier", action="append", default=[], metavar="NAME=MODEL:MAX_TOKENS",
+                        help="override a router tier, e.g. complex=gpt-4o:1200")
+    parser.add_argument("--memory-rate", type=float, default=0, help="mem0 requests per second (0 = unlimited)")
+    parser.add_argument("--llm-rate", type=float, default=0, help="OpenAI requests per second (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake calls failing with 429/503")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--breaker-threshold", type=int, default=5, help="consecutive failures that open a circuit")
+    parser.add_argument("--max-onboarding-prompt", type=int, default=0, metavar="TOKENS",
+                        help="exit with an error if an onboarding reply prompt exceeds this many tokens")
+    parser.add_argument("--json", help="write the full report to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    largest = report["onboarding_prompt_tokens"]["max"]
+    if args.max_onboarding_prompt and largest > args.max_onboarding_prompt:
+        print(f"onboarding prompt reached {largest} tokens, over the {args.max_onboarding_prompt} token limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
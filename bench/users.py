@@ -0,0 +1,60 @@
+from bench.fakes import FINISHED_PHRASE
+
+FIRST_NAMES = ("amina", "ben", "carla", "dev", "elena", "farid", "grace", "hiro", "ines", "jonas",
+               "kemi", "liam", "maya", "noor", "omar", "priya", "quinn", "rosa", "sami", "tara")
+LAST_NAMES = ("ahmed", "baker", "chen", "diaz", "evans", "fischer", "garcia", "haddad", "ito", "jensen",
+              "khan", "lopez", "mensah", "novak", "okafor", "patel", "rossi", "silva", "tanaka", "weber")
+PROFESSIONS = (
+    ("civil engineer", ("AutoCAD", "Civil 3D", "Primavera"), "PE license"),
+    ("teacher", ("Google Classroom", "Canvas", "curriculum design"), "teaching certificate"),
+    ("nurse", ("Epic", "patient monitoring", "triage"), "BSN"),
+    ("marketing manager", ("Google Analytics", "HubSpot", "SEO"), "Google Ads certification"),
+    ("financial analyst", ("Excel", "Bloomberg", "SQL"), "CFA Level II"),
+    ("sales executive", ("Salesforce", "MEDDIC", "territory planning"), "Sandler training"),
+)
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December")
+
+# Mix of factual lookups and advice questions from the app's example list
+ADVICE_QUERIES = (
+    "What is my current salary?",
+    "When does my current contract end?",
+    "What are my technical skills?",
+    "What career path should I pursue with my background?",
+    "How can I transition to a data science role?",
+    "What skills should I develop for my desired role?",
+    "What's a realistic timeline for my career transition?",
+)
+
+
+def synthetic_user(index, rng, onboarding_turns=6):
+    """Return (raw name input, onboarding answers, advice queries) for one synthetic user"""
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    name = f"{first} {last}{index}"
+    profession, skills, certification = rng.choice(PROFESSIONS)
+    salary = rng.randrange(40, 180) * 1000
+    year = rng.randrange(2026, 2029)
+    answers = [
+        f"My name is {first.title()} {last.title()}. I was born on {rng.choice(MONTHS)} {rng.randrange(1, 28)}, "
+        f"{rng.randrange(1970, 2002)} and I live in Lisbon. My email is {first}.{last}{index}@example.com.",
+        f"I currently work as a {profession} at Company{index}. My salary is ${salary:,} a year and I work hybrid on a full-time contract.",
+        f"I am proficient with {', '.join(skills)}. I hold a {certification}.",
+        f"Previously I worked for six years as a junior {profession} where I managed small projects.",
+        "I want to move into a senior leadership role in a larger organisation and I would relocate to Berlin.",
+        f"My contract ends on {rng.choice(MONTHS)} {year} and I plan to finish my next certification within 8 months.",
+    ]
+    while len(answers) < onboarding_turns - 1:
+        answers.append("I also mentor two junior colleagues and speak English and Portuguese.")
+    answers = answers[:max(0, onboarding_turns - 1)]
+    answers.append(f"I think {FINISHED_PHRASE} for now.")
+    return name, answers, list(ADVICE_QUERIES)
+
+
+def profile_updates(rng, count):
+    """Later messages from a returning user: raises that supersede the stored salary, and restated facts"""
+    updates = []
+    for _ in range(count):
+        updates.append(f"Good news, my salary is now ${rng.randrange(40, 180) * 1000:,} a year.")
+        updates.append("I currently mentor two junior colleagues and speak English and Portuguese.")
+    return updates
@@ -0,0 +1,330 @@
+"""Bulk-import profiles from HR exports instead of the onboarding chat.
+
+Reads CSV or JSONL one record at a time, maps each record's fields (and any
+résumé text) onto the profile schema and onboarding categories, and writes
+one mem0 `add` per user with bounded concurrency. Progress is checkpointed
+after every batch, so an interrupted run resumes where it stopped:
+
+    python -m bulk_import cohort.csv --concurrency 8
+    python -m bulk_import cohort.jsonl --checkpoint cohort.ckpt.json
+
+Columns may be schema field names (`role`, `salary`, `technical_skills`),
+`section.field` pairs (`current_job.company`), common HR aliases (`name`,
+`job_title`, `employer`) or free text (`resume`, `summary`, `notes`).
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from advisor_service import format_name, is_full_name
+from profile_categories import ONBOARDING_CATEGORIES, categorize, split_sentences
+from profile_store import PROFILE_SCHEMA, empty_profile, merge_profile, extract_profile_facts
+from resilience import current_session
+
+logger = logging.getLogger(__name__)
+
+# Common HR export column names and the profile field they hold
+FIELD_ALIASES = {
+    "name": ("personal", "full_name"),
+    "employee_name": ("personal", "full_name"),
+    "date_of_birth": ("personal", "birth_date"),
+    "dob": ("personal", "birth_date"),
+    "city": ("personal", "location"),
+    "email_address": ("personal", "email"),
+    "phone_number": ("personal", "phone"),
+    "title": ("current_job", "role"),
+    "job_title": ("current_job", "role"),
+    "position": ("current_job", "role"),
+    "employer": ("current_job", "company"),
+    "skills": ("skills", "technical_skills"),
+    "contract_end": ("timeline", "contract_end_date"),
+    "target_role": ("aspirations", "desired_role"),
+    "relocation": ("relocation", "willing_to_relocate"),
+}
+
+# Columns holding free text such as a résumé, split into sentences and categorized
+TEXT_FIELDS = ("resume", "resume_text", "cv", "summary", "bio", "notes")
+
+LIST_FIELDS = ("technical_skills", "tools", "certifications", "previous_roles", "preferred_locations")
+
+# Profile sections stored under the onboarding category that collects them
+SECTION_CATEGORIES = {section: section for section in ONBOARDING_CATEGORIES}
+SECTION_CATEGORIES["relocation"] = "aspirations"
+
+_FIELD_SECTIONS = {field: section for section, fields in PROFILE_SCHEMA.items() for field in fields}
+
+
+def read_records(path, fmt=None):
+    """Yield records from a CSV or JSONL file without loading it into memory"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {"_error": f"line {number} is not valid JSON"}
+            yield record if isinstance(record, dict) else {"_error": f"line {number} is not an object"}
+
+
+def _column_target(column):
+    key = re.sub(r"[^a-z0-9.]+", "_", column.lower()).strip("_")
+    if "." in key:
+        section, field = key.split(".", 1)
+        if field in PROFILE_SCHEMA.get(section, ()):
+            return section, field
+        return None
+    if key in _FIELD_SECTIONS:
+        return _FIELD_SECTIONS[key], key
+    return FIELD_ALIASES.get(key)
+
+
+def map_record(record):
+    """Map one export record to (user_id, profile updates, memory messages).
+
+    Raises ValueError when the record has no usable full name.
+    """
+    if record.get("_error"):
+        raise ValueError(record["_error"])
+    updates, texts = {}, []
+    for column, value in record.items():
+        if column is None or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", [], {}):
+            continue
+        if re.sub(r"[^a-z]+", "_", column.lower()).strip("_") in TEXT_FIELDS:
+            texts.append(str(value))
+            continue
+        target = _column_target(column)
+        if target is None:
+            continue
+        section, field = target
+        if field in LIST_FIELDS and isinstance(value, str):
+            value = [item.strip() for item in re.split(r"[;|,]", value) if item.strip()]
+        updates.setdefault(section, {})[field] = value
+
+    # Explicit columns win over facts extracted from free text
+    profile = empty_profile()
+    for text in texts:
+        merge_profile(profile, extract_profile_facts(text))
+    merge_profile(profile, updates)
+
+    user_id = format_name(profile["personal"]["full_name"] or "")
+    if not is_full_name(user_id):
+        raise ValueError("record has no full name")
+    profile["personal"]["full_name"] = user_id
+
+    facts = {category: [] for category in ONBOARDING_CATEGORIES}
+    for section, fields in profile.items():
+        for field, value in fields.items():
+            if value in (None, "", []):
+                continue
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            facts[SECTION_CATEGORIES[section]].append(f"{field.replace('_', ' ').capitalize()}: {value}")
+    for text in texts:
+        for sentence in split_sentences(text):
+            facts[categorize(sentence) or "experience"].append(sentence.rstrip("."))
+
+    messages = [
+        {"role": "user", "content": f"{ONBOARDING_CATEGORIES[category][0]}. " + ". ".join(items) + "."}
+        for category, items in facts.items() if items
+    ]
+    return user_id, profile, messages
+
+
+class ImportCheckpoint:
+    """Resumable import progress, persisted atomically after every batch.
+
+    `watermark` is the number of leading records that are settled; records
+    beyond it that already succeeded are listed in `done`. Failed records
+    are not settled, so a resumed run retries them.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.watermark = 0
+        self.done = set()
+        self.failed = {}
+        self.users = []
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("source") != self.source:
+            raise ValueError(f"checkpoint {self.path} belongs to {state.get('source')}; use --restart to start over")
+        self.watermark = state.get("watermark", 0)
+        self.done = set(state.get("done", []))
+        self.failed = {int(k): v for k, v in state.get("failed", {}).items()}
+        self.users = state.get("users", [])
+        return self
+
+    def settled(self, index):
+        return index < self.watermark or index in self.done
+
+    def mark(self, index, user_id=None, error=None):
+        if error is not None:
+            self.failed[index] = error
+            return
+        self.failed.pop(index, None)
+        self.done.add(index)
+        if user_id:
+            self.users.append(user_id)
+        while self.watermark in self.done:
+            self.done.discard(self.watermark)
+            self.watermark += 1
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "source": self.source,
+                "watermark": self.watermark,
+                "done": sorted(self.done),
+                "failed": {str(k): v for k, v in sorted(self.failed.items())},
+                "users": self.users,
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+def import_profiles(records, memory_client, profile_store=None, checkpoint=None, concurrency=4, batch_size=50,
+                    progress=None):
+    """Import an iterable of export records and return a summary report.
+
+    Records are processed in batches of `batch_size` with at most
+    `concurrency` mem0 writes in flight. Running apps list the imported
+    users after their next user index resync.
+    """
+    report = {"read": 0, "imported": 0, "skipped": 0, "invalid": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def import_one(index, record):
+        current_session.set("bulk-import")
+        try:
+            user_id, profile, messages = map_record(record)
+        except ValueError as e:
+            return index, None, str(e), True
+        try:
+            memory_client.add(messages, user_id=user_id)
+            if profile_store is not None:
+                profile_store.update(user_id, profile)
+            return index, user_id, None, False
+        except Exception as e:
+            return index, user_id, str(e), False
+
+    def run_batch(pool, batch):
+        for index, user_id, error, invalid in pool.map(lambda item: import_one(*item), batch):
+            if invalid:
+                report["invalid"] += 1
+                logger.warning("Skipping record %d: %s", index, error)
+                if checkpoint is not None:
+                    checkpoint.mark(index)
+            elif error is not None:
+                report["failed"] += 1
+                logger.error("Importing record %d (%s) failed: %s", index, user_id, error)
+                if checkpoint is not None:
+                    checkpoint.mark(index, error=error)
+            else:
+                report["imported"] += 1
+                if checkpoint is not None:
+                    checkpoint.mark(index, user_id)
+        if checkpoint is not None:
+            checkpoint.save()
+        if progress:
+            progress(report)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bulk-import") as pool:
+        batch = []
+        for index, record in enumerate(records):
+            report["read"] += 1
+            if checkpoint is not None and checkpoint.settled(index):
+                report["skipped"] += 1
+                continue
+            batch.append((index, record))
+            if len(batch) >= batch_size:
+                run_batch(pool, batch)
+                batch = []
+        if batch:
+            run_batch(pool, batch)
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or JSONL export")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from the file extension)")
+    parser.add_argument("--concurrency", type=int, default=4, help="mem0 writes in flight")
+    parser.add_argument("--batch-size", type=int, default=50, help="records per checkpointed batch")
+    parser.add_argument("--checkpoint", help="progress file (default: <path>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="print mapped records instead of importing them")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args(argv)
+    records = read_records(args.path, args.format)
+
+    if args.dry_run:
+        for index, record in enumerate(records):
+            try:
+                user_id, _, messages = map_record(record)
+                print(json.dumps({"record": index, "user_id": user_id, "messages": messages}))
+            except ValueError as e:
+                print(json.dumps({"record": index, "error": str(e)}))
+        return 0
+
+    from advisor_factory import create_memory_client
+    from profile_store import ProfileStore
+
+    memory_client = create_memory_client()
+    if memory_client is None:
+        return 1
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint.json"
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = ImportCheckpoint(checkpoint_path, args.path).load()
+    if checkpoint.watermark or checkpoint.done:
+        logger.info("Resuming after %d settled records", checkpoint.watermark + len(checkpoint.done))
+
+    report = import_profiles(
+        records,
+        memory_client.bound("import"),
+        profile_store=ProfileStore(os.getenv("PROFILE_DIR", ".profiles")),
+        checkpoint=checkpoint,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        progress=lambda r: logger.info("%d read, %d imported, %d failed", r["read"], r["imported"], r["failed"])
+    )
+    print(json.dumps(report, indent=2))
+    if report["failed"]:
+        print(f"{report['failed']} records failed; run the same command again to retry them.")
+    # Running app and API processes list the new users after their next user index resync
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
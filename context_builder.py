@@ -0,0 +1,93 @@
+import json
+import re
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character heuristic
+    _encoding = None
+
+
+def estimate_tokens(text):
+    """Estimate the number of prompt tokens in a piece of text"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, (len(text) + 3) // 4)
+
+
+def extract_memories(memory_results):
+    """Reduce a mem0 search payload to memory text, score and last update date"""
+    if isinstance(memory_results, dict):
+        memory_results = memory_results.get("results", [])
+    memories = []
+    for item in memory_results or []:
+        if isinstance(item, str):
+            memories.append({"memory": item, "score": 0.0, "updated": ""})
+            continue
+        text = (item.get("memory") or "").strip()
+        if not text:
+            continue
+        memories.append({
+            "memory": text,
+            "score": float(item.get("score") or 0.0),
+            "updated": (item.get("updated_at") or item.get("created_at") or "")[:10],
+        })
+    return memories
+
+
+def _word_set(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def is_near_duplicate(a, b, threshold=0.85):
+    """Check whether two memories share almost all of their words"""
+    words_a, words_b = _word_set(a), _word_set(b)
+    if not words_a or not words_b:
+        return words_a == words_b
+    return len(words_a & words_b) / len(words_a | words_b) >= threshold
+
+
+def dedupe_memories(memories, threshold=0.85):
+    """Drop duplicate or near-duplicate memories, keeping the first (highest ranked) one"""
+    kept = []
+    for memory in memories:
+        if any(is_near_duplicate(memory["memory"], k["memory"], threshold) for k in kept):
+            continue
+        kept.append(memory)
+    return kept
+
+
+def build_memory_context(memory_results, token_budget=600, dedupe_threshold=0.85):
+    """Pack the most relevant memories into a compact bullet list within a token budget.
+
+    Returns the context text and a report comparing its size with the raw
+    indented JSON payload that used to be pasted into the prompt.
+    """
+    memories = extract_memories(memory_results)
+    ranked = sorted(memories, key=lambda m: (m["score"], m["updated"]), reverse=True)
+    unique = dedupe_memories(ranked, dedupe_threshold)
+
+    lines = []
+    used = 0
+    for memory in unique:
+        line = f"- {memory['memory']}"
+        if memory["updated"]:
+            line += f" ({memory['updated']})"
+        cost = estimate_tokens(line + "\n")
+        if used + cost > token_budget:
+            continue
+        lines.append(line)
+        used += cost
+
+    raw_tokens = estimate_tokens(json.dumps(memory_results, indent=2))
+    report = {
+        "memories_in": len(memories),
+        "duplicates_dropped": len(memories) - len(unique),
+        "memories_kept": len(lines),
+        "raw_tokens": raw_tokens,
+        "context_tokens": used,
+        "tokens_saved": max(0, raw_tokens - used),
+    }
+    return "\n".join(lines), report
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from profile_categories import split_sentences
+
+
+class MemoryBackend:
+    """Interface for the memory operations app.py relies on.
+
+    Implementations mirror the subset of `mem0.MemoryClient` that the app
+    uses, so the mem0 client and the local store are interchangeable.
+    """
+
+    def add(self, messages, user_id):
+        raise NotImplementedError
+
+    def search(self, query, user_id, limit=None):
+        raise NotImplementedError
+
+    async def asearch(self, query, user_id, limit=None):
+        """Search without blocking the event loop; backends share the blocking client on a worker thread"""
+        return await asyncio.to_thread(self.search, query, user_id, limit)
+
+    def users(self, page=None, page_size=None):
+        """Known users; with `page` (1-based) and `page_size`, one page of them and whether more follow"""
+        raise NotImplementedError
+
+    def get_all(self, user_id):
+        raise NotImplementedError
+
+    def update(self, memory_id, text, user_id):
+        raise NotImplementedError
+
+    def delete(self, memory_id, user_id):
+        raise NotImplementedError
+
+
+class Mem0Backend(MemoryBackend):
+    """Memory backend served by the hosted mem0 platform"""
+
+    def __init__(self, api_key, http_client=None):
+        from mem0 import MemoryClient
+        if http_client is not None:
+            # mem0 points the given client at its API, keeping our pool limits and timeouts
+            self.client = MemoryClient(api_key=api_key, client=http_client)
+        else:
+            self.client = MemoryClient(api_key=api_key)
+        parameters = inspect.signature(self.client.users).parameters
+        self._paged_users = "page" in parameters and "page_size" in parameters
+
+    def add(self, messages, user_id):
+        return self.client.add(messages, user_id=user_id)
+
+    def search(self, query, user_id, limit=None):
+        if limit:
+            return self.client.search(query, user_id=user_id, top_k=limit)
+        return self.client.search(query, user_id=user_id)
+
+    def users(self, page=None, page_size=None):
+        if page is None or not page_size:
+            return self.client.users()
+        if self._paged_users:
+            return self.client.users(page=page, page_size=page_size)
+        # mem0 clients without paging return every user at once: serve them as the only page
+        results = self.client.users() if page == 1 else {"results": []}
+        return dict(results or {}, next=None)
+
+    def get_all(self, user_id):
+        return self.client.get_all(user_id=user_id)
+
+    def update(self, memory_id, text, user_id):
+        return self.client.update(memory_id, text)
+
+    def delete(self, memory_id, user_id):
+        return self.client.delete(memory_id)
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Dependency-free text embedder using signed feature hashing of words and word pairs"""
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _bucket(self, feature):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket, sign = self._bucket(feature)
+                matrix[row, bucket] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a local sentence-transformers model"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+class LocalMemoryBackend(MemoryBackend):
+    """In-process memory store with per-user memory-mapped embedding matrices.
+
+    Each user gets a directory holding `memories.jsonl` (one record per
+    memory) and `embeddings.f32` (a row-major float32 matrix, one row per
+    memory). Searches memory-map the matrix and score every row with a single
+    vectorized dot product, since rows are stored L2-normalized.
+    """
+
+    def __init__(self, directory=".memory", embedder=None):
+        self.directory = directory
+        self.embedder = embedder or HashingEmbedder()
+        self._lock = threading.Lock()
+        self._records = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _user_dir(self, user_id):
+        slug = re.sub(r"[^a-z0-9]+", "_", user_id.lower()).strip("_")[:40]
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.directory, f"{slug}_{digest}")
+
+    def _load_records(self, user_dir):
+        path = os.path.join(user_dir, "memories.jsonl")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._records.get(user_dir)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        self._records[user_dir] = (mtime, records)
+        return records
+
+    def _load_matrix(self, user_dir, rows):
+        path = os.path.join(user_dir, "embeddings.f32")
+        if not rows or not os.path.exists(path):
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+
+    def add(self, messages, user_id):
+        """Store each sentence the user said as a memory"""
+        texts = []
+        for message in messages:
+            if message.get("role") == "user":
+                texts.extend(split_sentences(message.get("content", "")))
+        with self._lock:
+            user_dir = self._user_dir(user_id)
+            os.makedirs(user_dir, exist_ok=True)
+            meta_path = os.path.join(user_dir, "user.json")
+            if not os.path.exists(meta_path):
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"name": user_id, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f)
+
+            existing = self._load_records(user_dir)
+            known = {record["memory"].lower() for record in existing}
+            texts = [t for t in dict.fromkeys(texts) if t.lower() not in known]
+            if not texts:
+                return {"results": []}
+
+            now = time.strftime("%Y-%m-%dT%H:%M:%S")
+            records = [{"id": str(uuid.uuid4()), "memory": t, "user_id": user_id,
+                        "created_at": now, "updated_at": now} for t in texts]
+            embeddings = self.embedder.embed(texts)
+            # Matrix first: a crash leaves unreferenced rows, never records without rows.
+            # Trailing rows from an interrupted write are dropped so rows stay aligned.
+            with open(os.path.join(user_dir, "embeddings.f32"), "ab") as f:
+                f.truncate(len(existing) * self.embedder.dim * 4)
+                f.write(embeddings.astype(np.float32).tobytes())
+            with open(os.path.join(user_dir, "memories.jsonl"), "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+        return {"results": [{"id": r["id"], "memory": r["memory"], "event": "ADD"} for r in records]}
+
+    def search(self, query, user_id, limit=None):
+        """Return the user's memories ranked by cosine similarity to the query"""
+        limit = limit or 10
+        user_dir = self._user_dir(user_id)
+        # Map the matrix under the lock: a concurrent update or delete swaps in a
+        # shorter file, while a mapping already made keeps the old one
+        with self._lock:
+            records = self._load_records(user_dir)
+            matrix = self._load_matrix(user_dir, len(records))
+        if not records:
+            return []
+        scores = matrix @ self.embedder.embed([query])[0]
+        top = min(limit, len(records))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [dict(records[i], score=float(scores[i])) for i in best]
+
+    def get_all(self, user_id):
+        with self._lock:
+            return [dict(record) for record in self._load_records(self._user_dir(user_id))]
+
+    def _rewrite(self, user_dir, records, matrix):
+        """Replace a user's records and embedding rows, each file swapped in atomically"""
+        matrix_path = os.path.join(user_dir, "embeddings.f32")
+        with open(matrix_path + ".tmp", "wb") as f:
+            f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        os.replace(matrix_path + ".tmp", matrix_path)
+        records_path = os.path.join(user_dir, "memories.jsonl")
+        with open(records_path + ".tmp", "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(records_path + ".tmp", records_path)
+        self._records.pop(user_dir, None)
+
+    def update(self, memory_id, text, user_id):
+        """Replace a memory's text and re-embed it"""
+        with self._lock:
+            user_dir = self._user_dir(user_id)
+            records = [dict(record) for record in self._load_records(user_dir)]
+            index = next((i for i, record in enumerate(records) if record["id"] == memory_id), None)
+            if index is None:
+                raise KeyError(memory_id)
+            matrix = np.array(self._load_matrix(user_dir, len(records)))
+            matrix[index] = self.embedder.embed([text])[0]
+            records[index].update(memory=text, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self._rewrite(user_dir, records, matrix)
+        return {"id": memory_id, "memory": text, "event": "UPDATE"}
+
+    def delete(self, memory_id, user_id):
+        with self._lock:
+            user_dir = self._user_dir(user_id)
+            records = self._load_records(user_dir)
+            index = next((i for i, record in enumerate(records) if record["id"] == memory_id), None)
+            if index is None:
+                raise KeyError(memory_id)
+            matrix = np.delete(np.array(self._load_matrix(user_dir, len(records))), index, axis=0)
+            self._rewrite(user_dir, records[:index] + records[index + 1:], matrix)
+        return {"id": memory_id, "event": "DELETE"}
+
+    def users(self, page=None, page_size=None):
+        entries = sorted(os.listdir(self.directory))
+        start = (page - 1) * page_size if page and page_size else 0
+        end = start + page_size if page and page_size else len(entries)
+        results = []
+        for entry in entries[start:end]:
+            try:
+                with open(os.path.join(self.directory, entry, "user.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            results.append({"name": meta["name"], "type": "user", "created_at": meta.get("created_at")})
+        return {"count": len(results), "results": results, "next": end < len(entries)}
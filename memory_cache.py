@@ -0,0 +1,95 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """Normalize a query so trivially different phrasings share a cache entry"""
+    if not query:
+        return ""
+    query = query.lower().strip()
+    query = re.sub(r"\s+", " ", query)
+    return query.rstrip("?!. ")
+
+
+class SearchCache:
+    """Process-wide LRU cache with TTL for per-user memory search results.
+
+    Entries are keyed on (user_id, user version, normalized query, result
+    limit). Bumping a user's version on every write makes all of that user's
+    older entries unreachable, so a cached search never returns stale memories.
+    Callers read `version` before searching and pass it to `put`, so results
+    fetched before a write are not stored under the version that follows it.
+    """
+
+    def __init__(self, max_size=512, ttl=600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _key(self, user_id, query, limit=None):
+        return (user_id, self._versions.get(user_id, 0), normalize_query(query), limit)
+
+    def version(self, user_id):
+        """Current write version of a user, to pass to `put` with results searched after reading it"""
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def get(self, user_id, query, limit=None):
+        """Return cached results, or None on a miss or an expired entry"""
+        with self._lock:
+            key = self._key(user_id, query, limit)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, user_id, query, results, limit=None, version=None):
+        """Store search results for a user and query; `limit` keeps short result lists apart from full ones.
+
+        Nothing is stored when `version` is given and the user has been written since it was read.
+        """
+        with self._lock:
+            if version is not None and version != self._versions.get(user_id, 0):
+                return
+            key = self._key(user_id, query, limit)
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        """Drop every cached search for a user after their memories change"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            stale = [key for key in self._entries if key[0] == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,335 @@
+"""Background consolidation of per-user memory sets.
+
+Every onboarding turn adds memories, so long-lived users accumulate
+near-duplicate facts and superseded values such as an old salary next to a
+new one, which bloats every search payload and prompt built from it.
+`plan_consolidation` walks a user's memories newest first: sentences that
+say nothing beyond profile facts (salary, birth date, contract end date,
+contact details) restated by a newer memory are dropped, and memories left as near
+duplicates of a newer one are merged into it. `MemoryConsolidator` applies
+plans off the request path, one user at a time, and skips users whose
+memories have not changed since their last run. Run by hand it only
+reports the plans unless `--apply` is given:
+
+    python -m memory_consolidation --all
+    python -m memory_consolidation "Jane Doe" --apply
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from context_builder import is_near_duplicate
+from profile_categories import split_sentences
+from profile_store import extract_profile_facts
+from resilience import current_session
+from retrieval import CATEGORY_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+def memory_records(payload):
+    """Memory records from a get_all or search payload"""
+    if isinstance(payload, dict):
+        payload = payload.get("results", [])
+    return [record for record in payload or [] if isinstance(record, dict) and record.get("id")]
+
+
+def memory_set_fingerprint(records):
+    """Hash of a user's memory ids and texts, used to skip unchanged users"""
+    items = sorted((record["id"], record.get("memory") or "") for record in records)
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+# Words that only phrase a detected fact, e.g. "My salary is now $120k a year"
+FACT_PHRASING = frozenset("""
+i m my me is am was are be been has have it now currently current new just recently finally so that this
+good news a an the of at on in to per around about approximately roughly gross net base before after tax
+and year years yearly annual annually month monthly salary earn earns earning paid pay make makes income
+got raise raised increased usd eur gbp pkr dollars euros pounds k born birth date birthday contract
+ends end ending expire expires finish finishes until will email e mail address phone number mobile
+linkedin profile reach reached contact can
+""".split())
+
+
+def _fact_fields(sentence):
+    return {(section, field) for section, fields in extract_profile_facts(sentence).items() for field in fields}
+
+
+def _states_only_facts(sentence):
+    """True when a sentence holds nothing but its detected profile facts and the words phrasing them"""
+    rest = sentence
+    for fields in extract_profile_facts(sentence).values():
+        for value in fields.values():
+            rest = rest.replace(value, " ")
+    return all(word in FACT_PHRASING for word in re.findall(r"[a-z]+", rest.lower()))
+
+
+def plan_consolidation(records, threshold=0.85):
+    """Plan the updates and deletions that shrink one user's memories without losing current facts.
+
+    Returns {"updates": {memory_id: text}, "deletes": [memory_id, ...], "kept": count}.
+    Only a value stated as the current one supersedes an older value:
+
+    >>> plan_consolidation([
+    ...     {"id": "1", "memory": "Salary is $90k", "created_at": "2024-01-01"},
+    ...     {"id": "2", "memory": "Salary is $120k", "created_at": "2025-01-01"},
+    ...     {"id": "9", "memory": "Expected salary for new role is $150k", "created_at": "2025-06-01"},
+    ... ])["deletes"]
+    ['1']
+    """
+    # Newest first; records written together keep their relative order
+    ordered = [record for _, _, record in sorted(
+        ((record.get("updated_at") or record.get("created_at") or "", -index, record)
+         for index, record in enumerate(records) if (record.get("memory") or "").strip()),
+        key=lambda item: item[:2], reverse=True)]
+
+    seen_fields, kept, updates, deletes = set(), [], {}, []
+    group, group_fields = None, set()
+    for record in ordered:
+        # Records with the same timestamp cannot tell which is newer, so they never supersede each other
+        stamp = record.get("updated_at") or record.get("created_at") or ""
+        if stamp != group:
+            seen_fields |= group_fields
+            group, group_fields = stamp, set()
+        text = record["memory"].strip()
+        current = []
+        for sentence in split_sentences(text):
+            fields = _fact_fields(sentence)
+            # Every fact in this sentence has a newer value and it says nothing else
+            if fields and fields <= seen_fields and _states_only_facts(sentence):
+                continue
+            current.append(sentence)
+            group_fields |= fields
+        merged = " ".join(current)
+        if not current or any(is_near_duplicate(merged, other, threshold) for other in kept):
+            deletes.append(record["id"])
+            continue
+        if merged != text:
+            updates[record["id"]] = merged
+        kept.append(merged)
+    return {"updates": updates, "deletes": deletes, "kept": len(kept)}
+
+
+def apply_plan(records, plan):
+    """The records a plan leaves behind, without touching the memory store"""
+    deleted = set(plan["deletes"])
+    return [dict(record, memory=plan["updates"].get(record["id"], record.get("memory")))
+            for record in records if record["id"] not in deleted]
+
+
+def _payload_bytes(payload):
+    return len(json.dumps(payload, default=str).encode("utf-8"))
+
+
+class ConsolidationState:
+    """Per-user fingerprints of the last consolidated memory set, persisted atomically"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.users = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.users = json.load(f)
+
+    def unchanged(self, user_id, fingerprint):
+        with self._lock:
+            return self.users.get(user_id, {}).get("fingerprint") == fingerprint
+
+    def record(self, user_id, fingerprint, memories):
+        with self._lock:
+            self.users[user_id] = {"fingerprint": fingerprint, "memories": memories,
+                                   "consolidated_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            if not self.path:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.users, f)
+            os.replace(tmp_path, self.path)
+
+
+def consolidate_user(client, user_id, state=None, threshold=0.85, probe_queries=None, dry_run=False, force=False):
+    """Consolidate one user's memories and report counts and payload sizes before and after.
+
+    `probe_queries` are searched before and after to measure the search
+    payload; without them only the full memory set is measured. A dry run
+    estimates the after figures from the plan instead of applying it.
+    """
+    before = memory_records(client.get_all(user_id=user_id))
+    fingerprint = memory_set_fingerprint(before)
+    report = {"user_id": user_id, "memories_before": len(before), "memory_bytes_before": _payload_bytes(before)}
+    if state is not None and not force and state.unchanged(user_id, fingerprint):
+        report.update(skipped=True, memories_after=len(before), memory_bytes_after=report["memory_bytes_before"])
+        return report
+
+    probes = {query: client.search(query, user_id=user_id) for query in probe_queries or ()}
+    plan = plan_consolidation(before, threshold)
+    after = apply_plan(before, plan)
+    if not dry_run:
+        for memory_id in plan["deletes"]:
+            client.delete(memory_id, user_id=user_id)
+        for memory_id, text in plan["updates"].items():
+            client.update(memory_id, text, user_id=user_id)
+        if state is not None:
+            state.record(user_id, memory_set_fingerprint(after), len(after))
+
+    report.update(
+        skipped=False,
+        deleted=len(plan["deletes"]),
+        updated=len(plan["updates"]),
+        memories_after=len(after),
+        memory_bytes_after=_payload_bytes(after),
+    )
+    if probes:
+        report["search_bytes_before"] = sum(_payload_bytes(results) for results in probes.values())
+        if dry_run:
+            report["search_bytes_after"] = sum(_payload_bytes(apply_plan(memory_records(results), plan))
+                                               for results in probes.values())
+        else:
+            report["search_bytes_after"] = sum(_payload_bytes(client.search(query, user_id=user_id))
+                                               for query in probes)
+    return report
+
+
+class MemoryConsolidator:
+    """Background worker that consolidates a user's memories once their writes settle.
+
+    `schedule` is called whenever memories are written for a user; the user
+    is consolidated after `delay` seconds without another write, one user at
+    a time on a single worker thread, so it never runs on a request thread
+    or in the middle of an onboarding interview. With `dry_run` the plans
+    are only logged and no memory is changed.
+    """
+
+    def __init__(self, client_factory, state=None, delay=300.0, threshold=0.85, on_consolidated=None,
+                 dry_run=False):
+        self.client_factory = client_factory
+        self.state = state or ConsolidationState()
+        self.delay = delay
+        self.threshold = threshold
+        self.on_consolidated = on_consolidated
+        self.dry_run = dry_run
+        self.stats = {"users": 0, "skipped": 0, "failures": 0, "deleted": 0, "updated": 0,
+                      "memory_bytes_saved": 0}
+        self._due = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._worker = None
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, name="memory-consolidator", daemon=True)
+        self._worker.start()
+        return self
+
+    def schedule(self, user_id):
+        """Consolidate `user_id` once `delay` seconds pass without another call for them"""
+        with self._cond:
+            self._due[user_id] = time.monotonic() + self.delay
+            self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return len(self._due)
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run_user(self, user_id):
+        """Consolidate one user now and return the report, or None when it failed"""
+        client = self.client_factory()
+        if client is None:
+            return None
+        try:
+            report = consolidate_user(client, user_id, self.state, self.threshold, dry_run=self.dry_run)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error("Consolidating memories for %s failed: %s", user_id, e)
+            return None
+        if report["skipped"]:
+            self.stats["skipped"] += 1
+            return report
+        if self.dry_run:
+            logger.info("Consolidation plan for %s: %d deletes, %d updates, %d -> %d memories", user_id,
+                        report["deleted"], report["updated"], report["memories_before"], report["memories_after"])
+            return report
+        self.stats["users"] += 1
+        self.stats["deleted"] += report["deleted"]
+        self.stats["updated"] += report["updated"]
+        self.stats["memory_bytes_saved"] += report["memory_bytes_before"] - report["memory_bytes_after"]
+        if (report["deleted"] or report["updated"]) and self.on_consolidated:
+            self.on_consolidated(user_id)
+        logger.info("Consolidated %s: %d -> %d memories", user_id, report["memories_before"], report["memories_after"])
+        return report
+
+    def _run(self):
+        current_session.set("memory-consolidation")
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    ready = [user for user, due in self._due.items() if due <= now]
+                    if ready:
+                        user_id = min(ready, key=self._due.get)
+                        del self._due[user_id]
+                        break
+                    self._cond.wait(min(self._due.values()) - now if self._due else None)
+                else:
+                    return
+            self.run_user(user_id)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("users", nargs="*", help="user ids to consolidate")
+    parser.add_argument("--all", action="store_true", help="consolidate every user known to mem0")
+    parser.add_argument("--threshold", type=float, default=0.85, help="word overlap that marks a near duplicate")
+    parser.add_argument("--state", default=os.getenv("MEMORY_CONSOLIDATION_STATE", ".cache/consolidation.json"),
+                        help="per-user fingerprints of the last run")
+    parser.add_argument("--force", action="store_true", help="consolidate users whose memories have not changed")
+    parser.add_argument("--no-probe", action="store_true", help="skip measuring search payloads")
+    parser.add_argument("--apply", action="store_true", help="delete and rewrite memories (default: only report the plan)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args(argv)
+
+    from advisor_factory import create_memory_client
+    from user_index import fetch_user_names
+
+    memory_client = create_memory_client()
+    if memory_client is None:
+        return 1
+    client = memory_client.bound("consolidation")
+    current_session.set("memory-consolidation")
+    users = fetch_user_names(client) if args.all else args.users
+    state = ConsolidationState(args.state)
+    probes = None if args.no_probe else list(CATEGORY_QUERIES.values())
+
+    totals = {"users": 0, "memories_before": 0, "memories_after": 0, "memory_bytes_before": 0, "memory_bytes_after": 0}
+    for user_id in users:
+        report = consolidate_user(client, user_id, state, args.threshold, probes, not args.apply, args.force)
+        print(json.dumps(report))
+        totals["users"] += 1
+        for key in ("memories_before", "memories_after", "memory_bytes_before", "memory_bytes_after"):
+            totals[key] += report[key]
+    print(json.dumps(totals, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
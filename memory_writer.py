@@ -0,0 +1,165 @@
+import atexit
+import logging
+import random
+import threading
+import time
+
+from resilience import CircuitOpenError, RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriteQueue:
+    """Background queue that coalesces conversation turns into batched mem0 writes.
+
+    Turns are buffered per user and written by a single worker thread, either
+    once the oldest buffered turn is `flush_interval` seconds old, once a user
+    has `max_batch_turns` turns buffered, or when `flush()` is called. Failed
+    writes are retried with exponential backoff before being dropped. A batch
+    rejected by an open circuit breaker or a full rate limit queue is put
+    back and tried again after the breaker's retry-after (at most
+    `max_requeue_delay` seconds), up to `max_requeues` times.
+    """
+
+    def __init__(self, client_factory, flush_interval=2.0, max_batch_turns=6,
+                 max_retries=4, backoff=0.5, on_written=None, max_requeues=10, max_requeue_delay=30.0):
+        self.client_factory = client_factory
+        self.flush_interval = flush_interval
+        self.max_batch_turns = max_batch_turns
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.on_written = on_written
+        self.max_requeues = max_requeues
+        self.max_requeue_delay = max_requeue_delay
+        self.stats = {"turns_enqueued": 0, "writes": 0, "retries": 0, "requeued": 0, "failed_writes": 0}
+        self._pending = {}
+        self._dropped = set()
+        self._inflight = set()
+        self._flush_requested = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="mem0-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def enqueue(self, user_id, messages):
+        """Buffer a conversation turn for a user without blocking on mem0"""
+        with self._cond:
+            entry = self._pending.setdefault(user_id, {"since": time.monotonic(), "turns": 0, "messages": [],
+                                                       "not_before": 0.0, "requeues": 0})
+            entry["messages"].extend(messages)
+            entry["turns"] += 1
+            self.stats["turns_enqueued"] += 1
+            self._cond.notify_all()
+
+    def pending_turns(self, user_id):
+        with self._cond:
+            entry = self._pending.get(user_id)
+            return entry["turns"] if entry else 0
+
+    def flush(self, user_id=None, wait=True, timeout=30.0):
+        """Write buffered turns now; return True once nothing is left pending and none was dropped"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            users = [user_id] if user_id is not None else list(self._pending)
+            self._flush_requested.update(users)
+            self._cond.notify_all()
+            if not wait:
+                return False
+            while any(u in self._pending or u in self._inflight for u in users):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            dropped = self._dropped & set(users) if user_id is not None else set(self._dropped)
+            self._dropped -= dropped
+            return not dropped
+
+    def close(self, timeout=30.0):
+        """Flush every user and stop the worker thread"""
+        if self._stopped:
+            return
+        self.flush(timeout=timeout)
+        with self._cond:
+            if self._pending:
+                logger.error("Stopping with buffered messages for %d users unwritten", len(self._pending))
+            self._stopped = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    def _take_ready(self):
+        now = time.monotonic()
+        ready = []
+        for user_id, entry in list(self._pending.items()):
+            if entry["not_before"] > now:
+                continue
+            if (user_id in self._flush_requested
+                    or entry["turns"] >= self.max_batch_turns
+                    or now - entry["since"] >= self.flush_interval):
+                ready.append((user_id, self._pending.pop(user_id)))
+                self._flush_requested.discard(user_id)
+                self._inflight.add(user_id)
+        return ready
+
+    def _run(self):
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+                while not ready and not self._stopped:
+                    self._cond.wait(self.flush_interval / 2)
+                    ready = self._take_ready()
+                if not ready and self._stopped:
+                    return
+            for user_id, entry in ready:
+                delay = self._write(user_id, entry)
+                with self._cond:
+                    if delay is not None:
+                        self._requeue(user_id, entry, delay)
+                    self._inflight.discard(user_id)
+                    self._cond.notify_all()
+
+    def _requeue(self, user_id, entry, delay):
+        """Put a rejected batch back ahead of any turns buffered since"""
+        newer = self._pending.pop(user_id, None)
+        entry["not_before"] = time.monotonic() + delay
+        entry["requeues"] += 1
+        if newer:
+            entry["messages"].extend(newer["messages"])
+            entry["turns"] += newer["turns"]
+        self._pending[user_id] = entry
+        self.stats["requeued"] += 1
+
+    def _drop(self, user_id, messages, error):
+        self.stats["failed_writes"] += 1
+        logger.error("Dropping %d buffered messages for %s: %s", len(messages), user_id, error)
+        with self._cond:
+            self._dropped.add(user_id)
+
+    def _write(self, user_id, entry):
+        """Write one batch; return the delay before trying again when mem0 turned it away, else None"""
+        messages = entry["messages"]
+        for attempt in range(self.max_retries + 1):
+            try:
+                client = self.client_factory()
+                if client is None:
+                    raise RuntimeError("memory client is not configured")
+                client.add(messages, user_id=user_id)
+                self.stats["writes"] += 1
+                if self.on_written:
+                    self.on_written(user_id)
+                return None
+            except (CircuitOpenError, RateLimitTimeout) as e:
+                # Rejected before reaching mem0: keep the batch until the service takes writes again
+                if entry["requeues"] < self.max_requeues:
+                    delay = getattr(e, "retry_after", None) or self.backoff * (2 ** entry["requeues"])
+                    logger.warning("Requeueing %d buffered messages for %s: %s", len(messages), user_id, e)
+                    return min(delay, self.max_requeue_delay)
+                self._drop(user_id, messages, e)
+                return None
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._drop(user_id, messages, e)
+                    return None
+                self.stats["retries"] += 1
+                delay = self.backoff * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
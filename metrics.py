@@ -0,0 +1,353 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Flow label ("onboarding", "advice", "directory", ...) attached to every external call
+current_flow = contextvars.ContextVar("current_flow", default="other")
+
+# Model tier chosen by the router for the LLM call in progress, if any
+current_tier = contextvars.ContextVar("current_tier", default=None)
+
+# USD per million tokens as (prompt, completion)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# USD per million prompt tokens served from the provider's prompt cache
+CACHED_PROMPT_PRICES = {
+    "gpt-4o-mini": 0.075,
+    "gpt-4o": 1.25,
+    "gpt-4.1-mini": 0.10,
+    "gpt-4.1-nano": 0.025,
+}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _labels(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class Metrics:
+    """Thread-safe latency, error, token and cost counters for external calls.
+
+    Latency samples are kept in a bounded window per (operation, flow) so
+    percentiles reflect recent traffic; counts, sums and token totals are
+    cumulative for the life of the process.
+    """
+
+    def __init__(self, window=2000):
+        self.window = window
+        self._latencies = {}
+        self._counts = {}
+        self._sums = {}
+        self._errors = {}
+        self._tokens = {}
+        self._cost = {}
+        self._tiers = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _tier(self, tier):
+        return self._tiers.setdefault(tier, {"latencies": deque(maxlen=self.window), "count": 0, "errors": 0,
+                                             "sum": 0.0, "prompt": 0, "completion": 0, "usd": 0.0})
+
+    def observe(self, operation, flow, seconds, error=False, tier=None):
+        key = (operation, flow)
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._sums[key] = self._sums.get(key, 0.0) + seconds
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            if tier is not None:
+                stats = self._tier(tier)
+                stats["latencies"].append(seconds)
+                stats["count"] += 1
+                stats["sum"] += seconds
+                stats["errors"] += int(error)
+
+    def record_usage(self, flow, model, usage, tier=None):
+        """Add token usage from an OpenAI `response.usage` object and its estimated cost"""
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        # Part of the prompt may have been served from the provider's prompt cache at a discount
+        cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+        prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        cached_price = CACHED_PROMPT_PRICES.get(model, prompt_price)
+        usd = ((prompt - cached) * prompt_price + cached * cached_price + completion * completion_price) / 1e6
+        with self._lock:
+            for kind, count in (("prompt", prompt), ("completion", completion), ("cached_prompt", cached)):
+                if kind == "cached_prompt" and not count:
+                    continue
+                key = (flow, model, kind)
+                self._tokens[key] = self._tokens.get(key, 0) + count
+            key = (flow, model)
+            self._cost[key] = self._cost.get(key, 0.0) + usd
+            if tier is not None:
+                stats = self._tier(tier)
+                stats["prompt"] += prompt
+                stats["completion"] += completion
+                stats["usd"] += usd
+
+    def add_collector(self, collector):
+        """Register a callable returning extra (name, labels, value) gauges at export time"""
+        self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            for store in (self._latencies, self._counts, self._sums, self._errors, self._tokens, self._cost,
+                          self._tiers):
+                store.clear()
+
+    def summary(self):
+        """Return per-call latency percentiles plus token and cost totals"""
+        with self._lock:
+            calls = []
+            for (operation, flow), samples in sorted(self._latencies.items()):
+                values = list(samples)
+                calls.append({
+                    "operation": operation,
+                    "flow": flow,
+                    "count": self._counts[(operation, flow)],
+                    "errors": self._errors.get((operation, flow), 0),
+                    "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                    "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                    "mean_ms": round(self._sums[(operation, flow)] / self._counts[(operation, flow)] * 1000, 3),
+                })
+            tokens = [{"flow": f, "model": m, "type": k, "tokens": v} for (f, m, k), v in sorted(self._tokens.items())]
+            cost = [{"flow": f, "model": m, "usd": round(v, 6)} for (f, m), v in sorted(self._cost.items())]
+            tiers = [{
+                "tier": tier,
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "p50_ms": round(percentile(list(stats["latencies"]), 0.50) * 1000, 3),
+                "p95_ms": round(percentile(list(stats["latencies"]), 0.95) * 1000, 3),
+                "mean_ms": round(stats["sum"] / stats["count"] * 1000, 3) if stats["count"] else 0.0,
+                "prompt_tokens": stats["prompt"],
+                "completion_tokens": stats["completion"],
+                "usd": round(stats["usd"], 6),
+            } for tier, stats in sorted(self._tiers.items())]
+        gauges = []
+        for collector in self._collectors:
+            try:
+                gauges.extend({"name": n, "labels": l, "value": v} for n, l, v in collector())
+            except Exception:
+                continue
+        return {"calls": calls, "tokens": tokens, "cost": cost, "tiers": tiers, "gauges": gauges}
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        summary = self.summary()
+        lines = [
+            "# HELP careercoach_external_call_seconds Latency of external mem0 and OpenAI calls.",
+            "# TYPE careercoach_external_call_seconds summary",
+        ]
+        with self._lock:
+            sums = dict(self._sums)
+        for call in summary["calls"]:
+            labels = {"operation": call["operation"], "flow": call["flow"]}
+            for q, field in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                lines.append(f"careercoach_external_call_seconds{{{_labels(dict(labels, quantile=q))}}} {call[field] / 1000}")
+            lines.append(f"careercoach_external_call_seconds_sum{{{_labels(labels)}}} {sums[(call['operation'], call['flow'])]}")
+            lines.append(f"careercoach_external_call_seconds_count{{{_labels(labels)}}} {call['count']}")
+        lines += ["# TYPE careercoach_external_call_errors_total counter"]
+        for call in summary["calls"]:
+            lines.append(f"careercoach_external_call_errors_total{{{_labels({'operation': call['operation'], 'flow': call['flow']})}}} {call['errors']}")
+        lines += ["# TYPE careercoach_llm_tokens_total counter"]
+        for row in summary["tokens"]:
+            lines.append(f"careercoach_llm_tokens_total{{{_labels({'flow': row['flow'], 'model': row['model'], 'type': row['type']})}}} {row['tokens']}")
+        lines += ["# TYPE careercoach_llm_cost_usd_total counter"]
+        for row in summary["cost"]:
+            lines.append(f"careercoach_llm_cost_usd_total{{{_labels({'flow': row['flow'], 'model': row['model']})}}} {row['usd']}")
+        lines += ["# TYPE careercoach_llm_tier_seconds summary"]
+        for row in summary["tiers"]:
+            for q, field in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                lines.append(f"careercoach_llm_tier_seconds{{{_labels({'tier': row['tier'], 'quantile': q})}}} {row[field] / 1000}")
+            lines.append(f"careercoach_llm_tier_seconds_count{{{_labels({'tier': row['tier']})}}} {row['count']}")
+        lines += ["# TYPE careercoach_llm_tier_cost_usd_total counter"]
+        for row in summary["tiers"]:
+            lines.append(f"careercoach_llm_tier_cost_usd_total{{{_labels({'tier': row['tier']})}}} {row['usd']}")
+        for gauge in summary["gauges"]:
+            lines.append(f"{gauge['name']}{{{_labels(gauge['labels'])}}} {gauge['value']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def with_flow(flow):
+    """Decorator that labels every external call made inside the function with `flow`"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = current_flow.set(flow)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    current_flow.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = current_flow.set(flow)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_flow.reset(token)
+        return wrapper
+    return decorator
+
+
+class InstrumentedMemory:
+    """Memory client proxy that times add, search, users and memory maintenance calls"""
+
+    def __init__(self, backend, flow=None):
+        self.backend = backend
+        self.flow = flow
+
+    def bound(self, flow):
+        """Return a proxy that always labels calls with `flow`, e.g. for background threads"""
+        return InstrumentedMemory(self.backend, flow)
+
+    def _timed(self, operation, func, *args, **kwargs):
+        flow = self.flow or current_flow.get()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            metrics.observe(operation, flow, time.perf_counter() - start, error=True)
+            raise
+        metrics.observe(operation, flow, time.perf_counter() - start)
+        return result
+
+    def add(self, *args, **kwargs):
+        return self._timed("memory.add", self.backend.add, *args, **kwargs)
+
+    def search(self, *args, **kwargs):
+        return self._timed("memory.search", self.backend.search, *args, **kwargs)
+
+    async def asearch(self, *args, **kwargs):
+        """Timed search that runs on a worker thread unless the backend has its own `asearch`"""
+        flow = self.flow or current_flow.get()
+        start = time.perf_counter()
+        try:
+            if hasattr(self.backend, "asearch"):
+                result = await self.backend.asearch(*args, **kwargs)
+            else:
+                result = await asyncio.to_thread(self.backend.search, *args, **kwargs)
+        except Exception:
+            metrics.observe("memory.search", flow, time.perf_counter() - start, error=True)
+            raise
+        metrics.observe("memory.search", flow, time.perf_counter() - start)
+        return result
+
+    def users(self, page=None, page_size=None):
+        return self._timed("memory.users", self.backend.users, page=page, page_size=page_size)
+
+    def get_all(self, *args, **kwargs):
+        return self._timed("memory.get_all", self.backend.get_all, *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._timed("memory.update", self.backend.update, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._timed("memory.delete", self.backend.delete, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, **kwargs):
+        flow = current_flow.get()
+        tier = current_tier.get()
+        model = kwargs.get("model", "")
+        start = time.perf_counter()
+        try:
+            response = self._client.chat.completions.create(**kwargs)
+        except Exception:
+            metrics.observe("llm.chat", flow, time.perf_counter() - start, error=True, tier=tier)
+            raise
+        if kwargs.get("stream"):
+            return self._stream(response, flow, model, tier, start)
+        metrics.observe("llm.chat", flow, time.perf_counter() - start, tier=tier)
+        metrics.record_usage(flow, model, getattr(response, "usage", None), tier=tier)
+        return response
+
+    def _stream(self, chunks, flow, model, tier, start):
+        error = False
+        try:
+            for chunk in chunks:
+                if getattr(chunk, "usage", None) is not None:
+                    metrics.record_usage(flow, model, chunk.usage, tier=tier)
+                yield chunk
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.observe("llm.chat", flow, time.perf_counter() - start, error=error, tier=tier)
+
+
+class InstrumentedOpenAI:
+    """OpenAI client proxy that times chat completions and records token usage"""
+
+    def __init__(self, client):
+        self._client = client
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = _Completions(client)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a background thread"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = metrics.to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
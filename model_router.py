@@ -0,0 +1,71 @@
+import os
+import re
+from collections import namedtuple
+
+from profile_store import ADVICE_MARKERS, classify_question
+
+Route = namedtuple("Route", "tier model max_tokens")
+
+# Model and completion budget per tier
+DEFAULT_TIERS = {
+    "simple": ("gpt-4.1-nano", 200),
+    "standard": ("gpt-4o-mini", 600),
+    "complex": ("gpt-4o-mini", 1200),
+    # JSON-mode profile and slot extraction; a truncated object cannot be parsed
+    "extraction": ("gpt-4o-mini", 1000),
+}
+
+# Requests for a plan or comparison get the largest tier
+COMPLEX_MARKERS = re.compile(
+    r"\b(plan|roadmap|strategy|step[- ]by[- ]step|timeline|transition|switch|pivot|compare|"
+    r"pros and cons|long[- ]term|career path|negotiat)\w*"
+)
+
+# Tier for the fixed-shape LLM calls outside advice
+TASK_TIERS = {
+    "onboarding": "standard",
+    "extraction": "extraction",
+}
+
+
+def parse_tier(spec, default):
+    """Parse a `model:max_tokens` setting, keeping the default for any missing part"""
+    if not spec:
+        return default
+    model, _, budget = spec.partition(":")
+    return (model.strip() or default[0], int(budget) if budget.strip() else default[1])
+
+
+def tiers_from_env(environ=os.environ):
+    """Tier table with MODEL_TIER_<NAME>=model:max_tokens overrides"""
+    return {name: parse_tier(environ.get(f"MODEL_TIER_{name.upper()}"), default)
+            for name, default in DEFAULT_TIERS.items()}
+
+
+def classify_advice(query):
+    """Complexity tier of an advice question from cheap local heuristics"""
+    lowered = (query or "").lower()
+    if classify_question(lowered) is not None:
+        # One-fact lookups the profile could not answer
+        return "simple"
+    if COMPLEX_MARKERS.search(lowered) or len(lowered.split()) > 30 or lowered.count("?") > 1:
+        return "complex"
+    return "standard"
+
+
+class ModelRouter:
+    """Picks a model tier and completion budget for each LLM request"""
+
+    def __init__(self, tiers=None, task_tiers=None):
+        self.tiers = dict(tiers or DEFAULT_TIERS)
+        self.task_tiers = dict(TASK_TIERS, **(task_tiers or {}))
+
+    def classify(self, task, query=None):
+        if task == "advice" and query:
+            return classify_advice(query)
+        return self.task_tiers.get(task, "standard")
+
+    def route(self, task, query=None):
+        tier = self.classify(task, query)
+        model, max_tokens = self.tiers.get(tier) or self.tiers["standard"]
+        return Route(tier, model, max_tokens)
@@ -0,0 +1,162 @@
+import json
+
+from context_builder import estimate_tokens
+from profile_categories import ONBOARDING_CATEGORIES
+from profile_store import PROFILE_SCHEMA, empty_profile, merge_profile
+
+# Coverage needed per onboarding category: each group of profile fields is
+# satisfied once any one of its fields is known (or marked not applicable)
+ONBOARDING_SLOTS = {
+    "personal": (
+        ("personal.full_name",),
+        ("personal.location",),
+        ("personal.email", "personal.phone", "personal.linkedin"),
+    ),
+    "current_job": (
+        ("current_job.role",),
+        ("current_job.company",),
+        ("current_job.employment_type", "current_job.work_setting"),
+    ),
+    "skills": (
+        ("skills.technical_skills", "skills.tools"),
+        ("skills.certifications",),
+    ),
+    "experience": (
+        ("experience.previous_roles",),
+    ),
+    "aspirations": (
+        ("aspirations.desired_role",),
+        ("aspirations.preferred_industry", "aspirations.preferred_work_setting"),
+        ("relocation.willing_to_relocate", "relocation.preferred_locations"),
+    ),
+    "timeline": (
+        ("timeline.contract_end_date", "timeline.job_search_timeline", "timeline.certification_completion"),
+    ),
+}
+
+# Value the extractor uses when the user says a slot does not apply to them
+NOT_APPLICABLE = "n/a"
+
+# Instructions for extracting slot values from one onboarding answer
+SLOT_EXTRACTION_ROLE = f"""
+You extract profile facts from one answer in a career onboarding interview.
+You receive the assistant's question and the user's answer as JSON.
+Return ONLY a JSON object with any of these sections and fields the answer mentions: {json.dumps(PROFILE_SCHEMA)}.
+Use short literal values exactly as the user stated them, lists for skills, tools, certifications and previous roles,
+and "{NOT_APPLICABLE}" when the user says something does not apply to them (for example no certifications or no contract).
+Omit everything the answer does not mention.
+"""
+
+# Sent instead of another LLM turn once every category is covered
+COVERAGE_COMPLETE_MESSAGE = ("Perfect! I now have all the information I need to provide you with personalized "
+                             "career advice. You can now ask me any career-related questions!")
+
+
+def _label(slot):
+    return slot.split(".", 1)[1].replace("_", " ")
+
+
+class SlotTracker:
+    """Slot-filling state for one onboarding interview.
+
+    Each answer is merged into a partial profile. The tracker reports which
+    slot groups are still missing, renders the prompt that asks only about
+    them, and declares the interview complete once every group is covered.
+    It also keeps the per-interview report: turns taken and the prompt
+    tokens used against a full-transcript baseline.
+    """
+
+    def __init__(self, baseline_turns=10):
+        self.baseline_turns = baseline_turns
+        self.reset()
+
+    def reset(self):
+        self.profile = empty_profile()
+        self.turns = 0
+        self.prompt_tokens = 0
+        self.baseline_prompt_tokens = 0
+        self.llm_calls_saved = 0
+
+    def to_dict(self):
+        """Serialize the tracker so stateless callers can send it back next turn"""
+        return {"baseline_turns": self.baseline_turns, "profile": self.profile, "turns": self.turns,
+                "prompt_tokens": self.prompt_tokens, "baseline_prompt_tokens": self.baseline_prompt_tokens,
+                "llm_calls_saved": self.llm_calls_saved}
+
+    @classmethod
+    def from_dict(cls, state):
+        tracker = cls(baseline_turns=int(state.get("baseline_turns", 10)))
+        merge_profile(tracker.profile, state.get("profile") or {})
+        for key in ("turns", "prompt_tokens", "baseline_prompt_tokens", "llm_calls_saved"):
+            setattr(tracker, key, int(state.get(key, 0)))
+        return tracker
+
+    def _filled(self, slot):
+        section, field = slot.split(".", 1)
+        return self.profile.get(section, {}).get(field) not in (None, "", [])
+
+    def update(self, slots):
+        """Merge extracted values into the interview's profile; return how many new slots were filled"""
+        before = sum(self._filled(f"{s}.{f}") for s, fields in PROFILE_SCHEMA.items() for f in fields)
+        merge_profile(self.profile, slots)
+        return sum(self._filled(f"{s}.{f}") for s, fields in PROFILE_SCHEMA.items() for f in fields) - before
+
+    def missing(self):
+        """Missing slot groups per category, in interview order"""
+        missing = {}
+        for category, groups in ONBOARDING_SLOTS.items():
+            gaps = [group for group in groups if not any(self._filled(slot) for slot in group)]
+            if gaps:
+                missing[category] = gaps
+        return missing
+
+    @property
+    def complete(self):
+        return not self.missing()
+
+    def coverage(self):
+        groups = [group for groups in ONBOARDING_SLOTS.values() for group in groups]
+        return sum(1 for group in groups if any(self._filled(slot) for slot in group)) / len(groups)
+
+    def known_profile(self):
+        """The filled slots only, for storing as the materialized profile"""
+        return {section: {field: value for field, value in fields.items()
+                          if value not in (None, "", [], NOT_APPLICABLE)}
+                for section, fields in self.profile.items()}
+
+    def format_prompt(self):
+        """System message steering the next question towards the missing slots only"""
+        known = [f"{_label(f'{s}.{f}')}: {', '.join(v) if isinstance(v, list) else v}"
+                 for s, fields in self.profile.items() for f, v in fields.items() if v not in (None, "", [])]
+        lines = ["Already collected (do not ask about these again): " + ("; ".join(known) if known else "nothing yet") + "."]
+        lines.append("Still missing, ask ONLY about these, 2-3 at a time, starting with the first category listed:")
+        for category, gaps in self.missing().items():
+            label = ONBOARDING_CATEGORIES[category][0]
+            lines.append(f"- {label}: " + "; ".join(" or ".join(_label(slot) for slot in group) for group in gaps))
+        return "\n".join(lines)
+
+    def record_prompt(self, messages, history, system_role):
+        """Count a reply prompt against the full-transcript prompt the same turn would have sent"""
+        self.prompt_tokens += sum(estimate_tokens(m["content"]) for m in messages)
+        self.baseline_prompt_tokens += estimate_tokens(system_role) + sum(estimate_tokens(m["content"]) for m in history)
+
+    def record_extraction(self, prompt_tokens):
+        self.prompt_tokens += prompt_tokens
+
+    def record_skipped_call(self, prompt_tokens):
+        """Count an LLM call the baseline flow would have made but coverage made unnecessary"""
+        self.baseline_prompt_tokens += prompt_tokens
+        self.llm_calls_saved += 1
+
+    def report(self):
+        """Per-interview summary of coverage, turns and prompt tokens saved"""
+        return {
+            "turns": self.turns,
+            "coverage": round(self.coverage(), 3),
+            "complete": self.complete,
+            "turns_saved": max(0, self.baseline_turns - self.turns) if self.complete else 0,
+            "prompt_tokens": self.prompt_tokens,
+            "baseline_prompt_tokens": self.baseline_prompt_tokens,
+            "tokens_saved": max(0, self.baseline_prompt_tokens - self.prompt_tokens),
+            "llm_calls_saved": self.llm_calls_saved,
+        }
@@ -0,0 +1,95 @@
+from profile_categories import ONBOARDING_CATEGORIES, categorize, split_sentences
+
+
+def empty_summary():
+    return {key: [] for key in ONBOARDING_CATEGORIES}
+
+
+def keyword_summarize(summary, messages):
+    """Fold conversation messages into the per-category fact summary without an LLM.
+
+    Each sentence of a user answer is filed under the category its keywords
+    match, falling back to the category of the question it answers.
+    """
+    summary = {key: list(facts) for key, facts in summary.items()}
+    asked_about = None
+    for message in messages:
+        if message["role"] == "assistant":
+            asked_about = categorize(message["content"])
+            continue
+        for sentence in split_sentences(message["content"]):
+            category = categorize(sentence) or asked_about or "personal"
+            summary.setdefault(category, []).append(sentence)
+    return summary
+
+
+def format_summary(summary):
+    """Render the fact summary as a compact system message"""
+    lines = ["Facts already collected earlier in this interview (do not ask for these again):"]
+    for key, (label, _) in ONBOARDING_CATEGORIES.items():
+        facts = summary.get(key) or []
+        lines.append(f"- {label}: {'; '.join(facts) if facts else 'nothing yet'}")
+    return "\n".join(lines)
+
+
+class OnboardingWindow:
+    """Bounded onboarding prompt: the last turns verbatim plus a rolling fact summary.
+
+    Older messages are folded into the summary `fold_turns` turns at a time so
+    the summarizer runs once per batch rather than on every turn, and each
+    category keeps only its most recent `max_facts` facts, which keeps the
+    prompt size bounded however long the interview runs.
+    """
+
+    def __init__(self, keep_turns=4, fold_turns=4, max_facts=8, max_fact_chars=200):
+        self.keep_turns = keep_turns
+        self.fold_turns = fold_turns
+        self.max_facts = max_facts
+        self.max_fact_chars = max_fact_chars
+        self.reset()
+
+    def reset(self):
+        self.summary = empty_summary()
+        self.folded = 0
+
+    def to_dict(self):
+        """Serialize the window state so stateless callers can send it back next turn"""
+        return {"keep_turns": self.keep_turns, "fold_turns": self.fold_turns,
+                "summary": self.summary, "folded": self.folded}
+
+    @classmethod
+    def from_dict(cls, state, **kwargs):
+        window = cls(keep_turns=int(state.get("keep_turns", 4)), fold_turns=int(state.get("fold_turns", 4)), **kwargs)
+        window.summary = window._trim(state.get("summary") or {})
+        window.folded = int(state.get("folded", 0))
+        return window
+
+    def _trim(self, summary):
+        trimmed = empty_summary()
+        for key, facts in summary.items():
+            if key not in trimmed or not isinstance(facts, list):
+                continue
+            trimmed[key] = [str(f)[:self.max_fact_chars] for f in facts if f][-self.max_facts:]
+        return trimmed
+
+    def build_messages(self, system_role, history, summarize=None):
+        """Build the chat messages for the next onboarding turn"""
+        if len(history) < self.folded:
+            # The conversation was restarted underneath us
+            self.reset()
+
+        boundary = len(history) - self.keep_turns * 2
+        if boundary - self.folded >= self.fold_turns * 2:
+            to_fold = history[self.folded:boundary]
+            try:
+                folded = (summarize or keyword_summarize)(self.summary, to_fold)
+            except Exception:
+                folded = keyword_summarize(self.summary, to_fold)
+            self.summary = self._trim(folded)
+            self.folded = boundary
+
+        messages = [{"role": "system", "content": system_role}]
+        if self.folded:
+            messages.append({"role": "system", "content": format_summary(self.summary)})
+        messages.extend(history[self.folded:])
+        return messages
@@ -0,0 +1,46 @@
+import re
+
+# Onboarding categories from ONBOARDING_SYSTEM_ROLE, with keywords used to
+# route free-text answers to the category they most likely describe
+ONBOARDING_CATEGORIES = {
+    "personal": ("Personal Information", (
+        "name", "born", "birth", "birthday", "live", "located", "location", "city",
+        "email", "phone", "linkedin", "married", "single", "marital",
+    )),
+    "current_job": ("Current Job Information", (
+        "currently", "current", "work at", "working at", "company", "employer", "salary",
+        "full-time", "part-time", "contract", "remote", "hybrid", "onsite", "role", "position",
+    )),
+    "skills": ("Field-Specific Skills & Expertise", (
+        "skill", "skills", "tool", "tools", "software", "certified", "certification",
+        "license", "proficient", "experienced with", "expertise", "language",
+    )),
+    "experience": ("Work Experience", (
+        "previously", "before that", "worked", "years", "experience", "responsib",
+        "managed", "led", "former",
+    )),
+    "aspirations": ("Career Aspirations", (
+        "want", "would like", "goal", "aspire", "dream", "desired", "prefer",
+        "industry", "relocate", "relocation", "move to", "transition",
+    )),
+    "timeline": ("Timeline & Milestones", (
+        "deadline", "ends", "end date", "expires", "by ", "within", "next year",
+        "months", "complete", "finish", "timeline",
+    )),
+}
+
+
+def categorize(text):
+    """Return the onboarding category whose keywords best match the text, or None"""
+    lowered = text.lower()
+    best, best_hits = None, 0
+    for key, (_, keywords) in ONBOARDING_CATEGORIES.items():
+        hits = sum(1 for keyword in keywords if keyword in lowered)
+        if hits > best_hits:
+            best, best_hits = key, hits
+    return best
+
+
+def split_sentences(text):
+    """Split free text into short sentences for fact extraction"""
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", text or "") if s.strip()]
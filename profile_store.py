@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from profile_categories import split_sentences
+
+# The seven profile categories named in CAREER_ADVISOR_SYSTEM_ROLE and their fields
+PROFILE_SCHEMA = {
+    "personal": ("full_name", "birth_date", "location", "email", "phone", "linkedin", "marital_status"),
+    "current_job": ("role", "company", "salary", "employment_type", "work_setting"),
+    "skills": ("technical_skills", "tools", "certifications"),
+    "experience": ("previous_roles",),
+    "aspirations": ("desired_role", "preferred_industry", "preferred_work_setting"),
+    "timeline": ("contract_end_date", "certification_completion", "job_search_timeline"),
+    "relocation": ("willing_to_relocate", "preferred_locations"),
+}
+
+# Words that turn a question into a request for advice rather than a lookup
+ADVICE_MARKERS = re.compile(
+    r"\b(should|how can|how do|how to|advice|advise|recommend|suggest|path|plan|transition|"
+    r"realistic|improve|develop|better|best|why|could i|would i|help me|compare)\b"
+)
+
+FACTUAL_OPENERS = re.compile(
+    r"^\s*(what(?:'s| is| are| was)|when(?:'s| is| does| do| will)|where(?:'s| is| do| am)|"
+    r"who(?:'s| is)|which|do i|am i|how much|tell me)\b"
+)
+
+# (pattern, section, field, answer template) for recognised factual lookups
+FACT_QUESTIONS = (
+    (r"\b(salary|paid|earn|income|compensation)\b", "current_job", "salary", "your current salary is {}."),
+    (r"\bcontract\b.*\b(end|expire|finish)", "timeline", "contract_end_date", "your current contract ends {}."),
+    (r"\b(birth ?date|birthday|born|date of birth)\b", "personal", "birth_date", "your date of birth is {}."),
+    (r"\b(e-?mail)\b", "personal", "email", "your email is {}."),
+    (r"\b(phone|mobile|cell)\b", "personal", "phone", "your phone number is {}."),
+    (r"\blinkedin\b", "personal", "linkedin", "your LinkedIn profile is {}."),
+    (r"\b(certification|certificate|license)s?\b", "skills", "certifications", "your certifications are {}."),
+    (r"\b(skills?|tools|expertise)\b", "skills", "technical_skills", "your technical skills are {}."),
+    (r"\b(company|employer|work for)\b", "current_job", "company", "you currently work at {}."),
+    (r"\b(job title|current (role|job|position))\b", "current_job", "role", "your current role is {}."),
+    (r"\b(employment type|full.time|part.time)\b", "current_job", "employment_type", "your employment type is {}."),
+    (r"\b(remote|hybrid|onsite|work setting)\b", "current_job", "work_setting", "your current work setting is {}."),
+    (r"\b(desired|dream|target) (role|job)\b", "aspirations", "desired_role", "your desired role is {}."),
+    (r"\brelocat", "relocation", "willing_to_relocate", "on relocation, you said: {}."),
+    (r"\b(live|location|based)\b", "personal", "location", "you are based in {}."),
+    (r"\b(previous|past) (roles|jobs|experience)\b", "experience", "previous_roles", "your previous roles are {}."),
+)
+
+# Words marking a value as past, hoped-for or otherwise not the current one
+NOT_CURRENT = re.compile(
+    r"\b(previous|previously|past|former|formerly|last|old|used to|desired|dream|target|expected|expecting|"
+    r"expectation|ideal|ideally|want|wants|hope|hoping|aim|aiming|goal|would like|future|next|offer|offered)\b"
+)
+
+_DATE = r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2}|[A-Z][a-z]+ \d{1,2},? \d{4}|\d{1,2} [A-Z][a-z]+ \d{4}|[A-Z][a-z]+ \d{4})"
+_AMOUNT = r"([$€£]\s?\d[\d,.]*\s?[kK]?|\d[\d,.]*\s?[kK]\b|\d[\d,.]{3,}\s?(?:USD|EUR|GBP|PKR|dollars|euros|pounds)?)"
+
+
+def empty_profile():
+    return {section: {field: None for field in fields} for section, fields in PROFILE_SCHEMA.items()}
+
+
+def merge_profile(profile, updates):
+    """Overlay non-empty values from `updates` onto a profile in place"""
+    for section, fields in (updates or {}).items():
+        if section not in PROFILE_SCHEMA or not isinstance(fields, dict):
+            continue
+        for field, value in fields.items():
+            if field in PROFILE_SCHEMA[section] and value not in (None, "", [], {}):
+                profile[section][field] = value
+    return profile
+
+
+def extract_profile_facts(user_message):
+    """Cheap regex extraction of unambiguous profile fields from a user answer"""
+    updates = {}
+
+    def put(section, field, value):
+        updates.setdefault(section, {})[field] = value.strip().rstrip(".")
+
+    email = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+", user_message)
+    if email:
+        put("personal", "email", email.group(0))
+    linkedin = re.search(r"(?:https?://)?(?:www\.)?linkedin\.com/\S+", user_message, re.I)
+    if linkedin:
+        put("personal", "linkedin", linkedin.group(0))
+    for phone in re.finditer(r"\+?\d[\d ()-]{8,}\d", user_message):
+        if len(re.sub(r"\D", "", phone.group(0))) >= 9 and not re.fullmatch(_DATE, phone.group(0)):
+            put("personal", "phone", phone.group(0))
+            break
+
+    # Values are taken from the clause holding their keyword, and only when it states the current value
+    for sentence in split_sentences(user_message):
+        for clause in re.split(r",\s+(?!\d{4}\b)|;\s*|\s+(?:and|but|while|whereas)\s+", sentence):
+            lowered = clause.lower()
+            amount = re.search(_AMOUNT, clause)
+            date = re.search(_DATE, clause)
+            current = not NOT_CURRENT.search(lowered)
+            if amount and current and re.search(r"\b(salary|earn|paid|make|income)\b", lowered):
+                put("current_job", "salary", amount.group(0))
+            if date and re.search(r"\b(born|birth)", lowered):
+                put("personal", "birth_date", date.group(0))
+            if date and current and "contract" in lowered and re.search(r"\b(end|expire|finish|until)", lowered):
+                put("timeline", "contract_end_date", date.group(0))
+    return updates
+
+
+def classify_question(query):
+    """Return (section, field, template) for a factual lookup, or None for an advice question"""
+    lowered = (query or "").lower().strip()
+    if not lowered or ADVICE_MARKERS.search(lowered) or not FACTUAL_OPENERS.search(lowered):
+        return None
+    if not re.search(r"\b(my|i|me)\b", lowered):
+        return None
+    for pattern, section, field, template in FACT_QUESTIONS:
+        match = re.search(pattern, lowered)
+        if match:
+            # "desired salary", "previous employer": not the field the profile holds
+            rest = lowered[:match.start()] + " " + lowered[match.end():]
+            if NOT_CURRENT.search(rest):
+                return None
+            return section, field, template
+    return None
+
+
+def answer_from_profile(profile, query, name=""):
+    """Answer a factual question straight from the profile, or return None"""
+    match = classify_question(query)
+    if not match or not profile:
+        return None
+    section, field, template = match
+    value = profile.get(section, {}).get(field)
+    if value in (None, "", []):
+        return None
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    first_name = name.split()[0] if name else ""
+    answer = template.format(value)
+    return f"{first_name}, {answer}" if first_name else answer[0].upper() + answer[1:]
+
+
+class ProfileStore:
+    """Per-user structured profiles persisted as JSON files in a local directory"""
+
+    def __init__(self, directory=".profiles"):
+        self.directory = directory
+        self._profiles = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, user_id):
+        slug = re.sub(r"[^a-z0-9]+", "_", user_id.lower()).strip("_")[:40]
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.directory, f"{slug}_{digest}.json")
+
+    def get(self, user_id):
+        """Return the user's profile, or None if nothing has been materialized yet"""
+        with self._lock:
+            if user_id in self._profiles:
+                return self._profiles[user_id]
+            try:
+                with open(self._path(user_id), encoding="utf-8") as f:
+                    profile = merge_profile(empty_profile(), json.load(f))
+            except (OSError, ValueError):
+                return None
+            self._profiles[user_id] = profile
+            return profile
+
+    def update(self, user_id, updates):
+        """Merge field updates into a user's profile and persist it"""
+        if not updates:
+            return self.get(user_id)
+        profile = self.get(user_id) or merge_profile(empty_profile(), {"personal": {"full_name": user_id}})
+        with self._lock:
+            merge_profile(profile, updates)
+            profile["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self._profiles[user_id] = profile
+            path = self._path(user_id)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(profile, f, indent=2)
+            os.replace(tmp_path, path)
+        return profile
@@ -0,0 +1,337 @@
+"""Shared resilience layer for the mem0 and OpenAI clients.
+
+Every remote call goes through a `ResiliencePolicy`, which combines:
+
+- a token-bucket `RateLimiter` that queues callers fairly across sessions
+  (round robin per `current_session`), so one busy session cannot starve others
+- a `CircuitBreaker` that fails fast while the service keeps erroring
+- `RetryPolicy` with jittered exponential backoff for 429s, 5xx responses,
+  timeouts and connection errors, honouring Retry-After
+
+Connection pooling and per-call timeouts live in the HTTP client built by
+`create_http_client`, which both SDKs accept.
+"""
+import contextvars
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from memory_backend import MemoryBackend
+
+# Identity used for fair queuing: a Streamlit session, API caller or background worker
+current_session = contextvars.ContextVar("current_session", default="default")
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = ("TimeoutException", "TransportError", "APITimeoutError", "APIConnectionError",
+                    "RateLimitError", "InternalServerError", "NetworkError")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a call waited longer than the queue timeout for a rate limit token"""
+
+
+def error_chain(error, limit=5):
+    """The error and the errors it was raised from; the mem0 SDK re-raises httpx errors as bare APIErrors"""
+    seen = []
+    while error is not None and len(seen) < limit and all(error is not e for e in seen):
+        seen.append(error)
+        error = error.__cause__ or error.__context__
+    return seen
+
+
+def status_code(error):
+    """HTTP status carried by an SDK or httpx error, if any"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error):
+    """Seconds requested by a Retry-After header anywhere in the error chain, or None"""
+    for cause in error_chain(error):
+        headers = getattr(getattr(cause, "response", None), "headers", None) or {}
+        try:
+            return max(0.0, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_retryable(error):
+    """True for throttling, server errors, timeouts and dropped connections, including wrapped ones"""
+    for cause in error_chain(error):
+        status = status_code(cause)
+        if status is not None:
+            return status in RETRYABLE_STATUS
+        if isinstance(cause, (TimeoutError, ConnectionError)):
+            return True
+        if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(cause).__mro__):
+            return True
+    return False
+
+
+def create_http_client(max_connections=100, max_keepalive=20, keepalive_expiry=30.0,
+                       timeout=30.0, connect_timeout=5.0):
+    """Pooled httpx client with per-call timeouts, shared by one SDK client"""
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_keepalive,
+                            keepalive_expiry=keepalive_expiry),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped at `max_delay`"""
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=8.0, rng=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt, error=None):
+        delay = self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        requested = retry_after(error) if error is not None else None
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one trial call through after `reset_timeout`"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f"{self.name} is unavailable, retrying in {remaining:.0f}s", remaining)
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError(f"{self.name} is recovering, please retry shortly")
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self):
+        """End a trial call whose error says nothing about the service's health"""
+        with self._lock:
+            self._trial_running = False
+
+
+class RateLimiter:
+    """Token bucket refilled at `rate` per second, granting tokens round robin across sessions.
+
+    Each session queues its own callers FIFO; whenever a token is available
+    it goes to the head of the session that was served least recently.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self.waited = 0.0
+        self._updated = time.monotonic()
+        self._queues = OrderedDict()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _next_ticket(self):
+        for queue in self._queues.values():
+            if queue:
+                return queue[0]
+        return None
+
+    def _remove(self, session, ticket):
+        queue = self._queues.get(session)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[session]
+
+    def queued(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(self, session="default", timeout=None):
+        """Block until a token is granted to this caller; raise RateLimitTimeout after `timeout` seconds"""
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            self._queues.setdefault(session, deque()).append(ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1 and self._next_ticket() is ticket:
+                        self.tokens -= 1
+                        self._queues[session].popleft()
+                        # Served sessions move to the back of the rotation
+                        if self._queues[session]:
+                            self._queues.move_to_end(session)
+                        else:
+                            del self._queues[session]
+                        self.waited += time.monotonic() - start
+                        self._cond.notify_all()
+                        return
+                    wait = (1 - self.tokens) / self.rate if self.tokens < 1 else None
+                    if timeout is not None:
+                        remaining = start + timeout - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"rate limit queue wait exceeded {timeout:.0f}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._remove(session, ticket)
+                self._cond.notify_all()
+                raise
+
+
+class ResiliencePolicy:
+    """Rate limiting, circuit breaking and retries around calls to one remote service"""
+
+    def __init__(self, name, limiter=None, breaker=None, retry=None, queue_timeout=30.0):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retry = retry or RetryPolicy(max_retries=0)
+        self.queue_timeout = queue_timeout
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, func, *args, **kwargs):
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                try:
+                    self.breaker.before_call()
+                except CircuitOpenError:
+                    self._count("rejected")
+                    raise
+            try:
+                if self.limiter is not None:
+                    self.limiter.acquire(current_session.get(), timeout=self.queue_timeout)
+                self._count("calls")
+                result = func(*args, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if self.breaker is not None:
+                    # Client errors such as a bad request say nothing about service health
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release()
+                if not retryable or attempt >= self.retry.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self.retry.delay(attempt, e))
+                attempt += 1
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+
+    def metric_samples(self):
+        samples = [("careercoach_client_calls_total", {"service": self.name, "result": key}, value)
+                   for key, value in self.stats.items()]
+        if self.breaker is not None:
+            samples.append(("careercoach_circuit_open", {"service": self.name},
+                            int(self.breaker.state != CircuitBreaker.CLOSED)))
+        if self.limiter is not None:
+            samples.append(("careercoach_rate_limit_queued", {"service": self.name}, self.limiter.queued()))
+            samples.append(("careercoach_rate_limit_wait_seconds_total", {"service": self.name},
+                            round(self.limiter.waited, 3)))
+        return samples
+
+
+class ResilientMemory(MemoryBackend):
+    """Memory backend proxy that routes every call through a ResiliencePolicy"""
+
+    def __init__(self, backend, policy):
+        self.backend = backend
+        self.policy = policy
+
+    def add(self, messages, user_id):
+        return self.policy.call(self.backend.add, messages, user_id=user_id)
+
+    def search(self, query, user_id, limit=None):
+        return self.policy.call(self.backend.search, query, user_id=user_id, limit=limit)
+
+    def users(self, page=None, page_size=None):
+        return self.policy.call(self.backend.users, page=page, page_size=page_size)
+
+    def get_all(self, user_id):
+        return self.policy.call(self.backend.get_all, user_id=user_id)
+
+    def update(self, memory_id, text, user_id):
+        return self.policy.call(self.backend.update, memory_id, text, user_id=user_id)
+
+    def delete(self, memory_id, user_id):
+        return self.policy.call(self.backend.delete, memory_id, user_id=user_id)
+
+
+class _ResilientCompletions:
+    def __init__(self, client, policy):
+        self._client = client
+        self._policy = policy
+
+    def create(self, **kwargs):
+        return self._policy.call(self._client.chat.completions.create, **kwargs)
+
+
+class ResilientOpenAI:
+    """OpenAI client proxy that routes chat completions through a ResiliencePolicy"""
+
+    def __init__(self, client, policy):
+        self._client = client
+        self.policy = policy
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = _ResilientCompletions(client, policy)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from context_builder import extract_memories
+from memory_cache import normalize_query
+
+
+def memory_fingerprint(memory_results):
+    """Order-independent hash of the memories a prompt was built from"""
+    memories = sorted((m["memory"], m["updated"]) for m in extract_memories(memory_results))
+    return hashlib.sha256(json.dumps(memories).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk LRU cache of generated answers, shared across sessions and restarts.
+
+    Entries are keyed on a hash of the system role, the normalized question
+    and the fingerprint of the retrieved memory set, so any new or updated
+    memory yields a new key and stale answers simply age out of the LRU.
+    """
+
+    def __init__(self, path=".cache/responses.sqlite3", max_entries=5000, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @staticmethod
+    def key(system_role, query, memory_results, namespace="", user_id=""):
+        """Cache key for an answer; `namespace` separates models and prompt settings, `user_id` users"""
+        parts = [
+            namespace,
+            user_id or "",
+            hashlib.sha256((system_role or "").encode("utf-8")).hexdigest(),
+            normalize_query(query),
+            memory_fingerprint(memory_results),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached answer, or None on a miss or an expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        """Store an answer and evict the least recently used entries beyond `max_entries`"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            excess = self._size() - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+    def _size(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": self._size(),
+            }
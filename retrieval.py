@@ -0,0 +1,83 @@
+"""Parallel retrieval for advice questions that span several profile categories.
+
+A question like "What's a realistic timeline for my career transition?" rarely
+matches the memories it depends on (contract end date, certifications,
+aspirations) in a single search. `plan_subqueries` adds one search per
+relevant profile category, and `fan_out` runs them concurrently so retrieval
+takes about as long as the slowest single search.
+"""
+import asyncio
+
+from memory_cache import normalize_query
+from profile_categories import ONBOARDING_CATEGORIES
+from profile_store import ADVICE_MARKERS
+
+# Search phrasing per profile category, worded like the facts stored during onboarding
+CATEGORY_QUERIES = {
+    "personal": "name, birth date, location and contact details",
+    "current_job": "current role, company, salary, employment type and work setting",
+    "skills": "technical skills, tools and certifications",
+    "experience": "previous roles, companies and key responsibilities",
+    "aspirations": "desired role, preferred industry, work setting and relocation preferences",
+    "timeline": "contract end date, certification completion and job search timeline",
+}
+
+# Question phrases and the categories an answer to them usually draws on
+QUESTION_CATEGORIES = (
+    (("timeline", "when", "how long", "realistic", "deadline"), ("timeline", "current_job", "aspirations")),
+    (("transition", "switch", "move into", "change career", "pivot"), ("aspirations", "skills", "experience", "timeline")),
+    (("career path", "pursue", "next step", "background"), ("aspirations", "experience", "skills")),
+    (("skill", "learn", "develop", "certif", "course"), ("skills", "aspirations")),
+    (("salary", "raise", "negotiat", "promotion"), ("current_job", "experience")),
+    (("relocat", "move to", "remote", "abroad"), ("aspirations", "personal")),
+)
+
+
+def plan_subqueries(query, max_queries=5):
+    """Return the searches to run for a question: the question itself plus one per relevant category.
+
+    Simple lookups (no advice wording) stay a single search.
+    """
+    lowered = (query or "").lower()
+    if not ADVICE_MARKERS.search(lowered):
+        return [query]
+
+    categories = []
+    for triggers, related in QUESTION_CATEGORIES:
+        if any(trigger in lowered for trigger in triggers):
+            categories.extend(c for c in related if c not in categories)
+    for key, (_, keywords) in ONBOARDING_CATEGORIES.items():
+        if key not in categories and any(keyword in lowered for keyword in keywords):
+            categories.append(key)
+    return [query] + [CATEGORY_QUERIES[c] for c in categories][:max(0, max_queries - 1)]
+
+
+def merge_results(result_lists):
+    """Merge several mem0 search payloads, keeping each memory once with its best score"""
+    merged = {}
+    for results in result_lists:
+        if isinstance(results, dict):
+            results = results.get("results", [])
+        for item in results or []:
+            if isinstance(item, str):
+                item = {"memory": item}
+            key = item.get("id") or normalize_query(item.get("memory"))
+            if not key:
+                continue
+            current = merged.get(key)
+            if current is None or float(item.get("score") or 0.0) > float(current.get("score") or 0.0):
+                merged[key] = item
+    return sorted(merged.values(), key=lambda r: float(r.get("score") or 0.0), reverse=True)
+
+
+async def fan_out(search, queries):
+    """Run `search(query)` for every query concurrently and merge the results.
+
+    Failed sub-queries are skipped; the first error is raised only when every
+    search failed.
+    """
+    outcomes = await asyncio.gather(*(search(q) for q in queries), return_exceptions=True)
+    results = [o for o in outcomes if not isinstance(o, BaseException)]
+    if not results and outcomes:
+        raise outcomes[0]
+    return merge_results(results)
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import deque
+
+
+class FirstTokenLog:
+    """Bounded, thread-safe record of time-to-first-token per streamed call"""
+
+    def __init__(self, max_records=500):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, flow, seconds):
+        with self._lock:
+            self._records.append({"flow": flow, "ttft": seconds, "at": time.time()})
+
+    def records(self, flow=None):
+        with self._lock:
+            return [r for r in self._records if flow is None or r["flow"] == flow]
+
+    def summary(self, flow=None):
+        """Return count, mean and max time-to-first-token in seconds"""
+        values = [r["ttft"] for r in self.records(flow)]
+        if not values:
+            return {"count": 0, "mean": 0.0, "max": 0.0}
+        return {"count": len(values), "mean": sum(values) / len(values), "max": max(values)}
+
+
+first_token_log = FirstTokenLog()
+
+
+def stream_chat_completion(openai_client, flow="chat", outcome=None, **kwargs):
+    """Yield content deltas from a streamed chat completion, logging time-to-first-token.
+
+    When an `outcome` dict is given, the completion's finish reason is stored in it under "finish_reason".
+    """
+    start = time.perf_counter()
+    first = True
+    # The final chunk carries token usage when include_usage is requested
+    for chunk in openai_client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs):
+        if not chunk.choices:
+            continue
+        if outcome is not None and chunk.choices[0].finish_reason:
+            outcome["finish_reason"] = chunk.choices[0].finish_reason
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if first:
+            first_token_log.record(flow, time.perf_counter() - start)
+            first = False
+        yield delta
+
+
+def render_stream(chunks, placeholder, template="{}", unsafe_allow_html=False, timing=None):
+    """Render a token stream into a Streamlit placeholder and return the full text.
+
+    When a `timing` dict is given, this call's time-to-first-token is stored in it under "ttft".
+    """
+    parts = []
+    start = time.perf_counter()
+    for delta in chunks:
+        if not parts and timing is not None:
+            timing["ttft"] = time.perf_counter() - start
+        parts.append(delta)
+        placeholder.markdown(template.format("".join(parts) + "▌"), unsafe_allow_html=unsafe_allow_html)
+    text = "".join(parts)
+    placeholder.markdown(template.format(text), unsafe_allow_html=unsafe_allow_html)
+    return text
@@ -0,0 +1,155 @@
+import bisect
+import difflib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_user_id(user_id):
+    return " ".join((user_id or "").split()).casefold()
+
+
+def iter_user_records(client, page_size=200):
+    """Yield user records from `client.users()`, page by page unless `page_size` is 0"""
+    if not page_size:
+        results = client.users()
+        yield from (results or {}).get('results', [])
+        return
+    page = 1
+    while True:
+        results = client.users(page=page, page_size=page_size) or {}
+        records = results.get('results', [])
+        yield from records
+        if len(records) < page_size or not results.get('next', True):
+            return
+        page += 1
+
+
+def fetch_user_names(client, page_size=200):
+    """Return the user names known to mem0"""
+    return [user['name'] for user in iter_user_records(client, page_size) if 'name' in user]
+
+
+class UserIndex:
+    """In-process sorted index of known users.
+
+    Serves constant-time existence checks and prefix/fuzzy directory search.
+    The index is seeded from mem0, updated locally when a user finishes
+    onboarding, refreshed incrementally on demand, and fully resynced by a
+    background thread so deleted profiles eventually disappear too.
+    """
+
+    def __init__(self, client_factory, resync_interval=300, page_size=200):
+        self.client_factory = client_factory
+        self.resync_interval = resync_interval
+        self.page_size = page_size
+        self.ready = False
+        self._display = {}
+        self._sorted = []
+        self._words = []
+        self._local = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fetch(self):
+        client = self.client_factory()
+        if client is None:
+            return None
+        return fetch_user_names(client, self.page_size)
+
+    def _insert(self, name):
+        key = normalize_user_id(name)
+        if not key or key in self._display:
+            return False
+        self._display[key] = " ".join(name.split())
+        bisect.insort(self._sorted, key)
+        for word in key.split()[1:]:
+            bisect.insort(self._words, (word, key))
+        return True
+
+    def resync(self):
+        """Replace the index with the current user list from mem0"""
+        try:
+            names = self._fetch()
+        except Exception as e:
+            logger.warning("User index resync failed: %s", e)
+            return False
+        if names is None:
+            return False
+        with self._lock:
+            # Keep locally added users that mem0 has not reported yet
+            self._local -= {normalize_user_id(name) for name in names}
+            local = [self._display[key] for key in self._local if key in self._display]
+            self._display, self._sorted, self._words = {}, [], []
+            for name in names + local:
+                self._insert(name)
+            self.ready = True
+        return True
+
+    def refresh(self):
+        """Fetch the user list and insert only users not already indexed; return how many were new"""
+        try:
+            names = self._fetch()
+        except Exception as e:
+            logger.warning("User index refresh failed: %s", e)
+            return 0
+        if names is None:
+            return 0
+        with self._lock:
+            added = sum(1 for name in names if self._insert(name))
+            self.ready = True
+        return added
+
+    def start(self):
+        """Seed the index and start the periodic background resync"""
+        self.resync()
+        if self._thread is None and self.resync_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="user-index-resync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.resync_interval):
+            self.resync()
+
+    def add(self, user_id):
+        with self._lock:
+            self._insert(user_id)
+            self._local.add(normalize_user_id(user_id))
+
+    def contains(self, user_id):
+        with self._lock:
+            return normalize_user_id(user_id) in self._display
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sorted)
+
+    def search(self, query="", offset=0, limit=20):
+        """Return one page of matching display names and the total number of matches.
+
+        Names whose full name or any later word (e.g. the last name) starts with
+        the query come first, in sorted order; if nothing matches by prefix,
+        close fuzzy matches are returned instead.
+        """
+        prefix = normalize_user_id(query)
+        with self._lock:
+            if not prefix:
+                keys = self._sorted[offset:offset + limit]
+                return [self._display[k] for k in keys], len(self._sorted)
+
+            start = bisect.bisect_left(self._sorted, prefix)
+            end = bisect.bisect_left(self._sorted, prefix + "￿")
+            matches = self._sorted[start:end]
+            word_start = bisect.bisect_left(self._words, (prefix,))
+            word_end = bisect.bisect_left(self._words, (prefix + "￿",))
+            matches.extend(sorted({key for _, key in self._words[word_start:word_end]} - set(matches)))
+
+            if not matches:
+                matches = difflib.get_close_matches(prefix, self._sorted, n=limit, cutoff=0.6)
+            return [self._display[k] for k in matches[offset:offset + limit]], len(matches)
@@ -0,0 +1,157 @@
+import hashlib
+
+from context_builder import dedupe_memories, estimate_tokens
+
+# Heading of the session memory message; static so it stays part of the cached prompt prefix
+WORKING_SET_HEADING = "Information retrieved from memory about the user during this session:"
+
+
+def _key(record):
+    return record.get("id") or " ".join((record.get("memory") or "").lower().split())
+
+
+def _line(record):
+    line = f"- {record['memory'].strip()}"
+    updated = (record.get("updated_at") or record.get("created_at") or "")[:10]
+    return f"{line} ({updated})" if updated else line
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _records(memory_results):
+    if isinstance(memory_results, dict):
+        memory_results = memory_results.get("results", [])
+    records = []
+    for item in memory_results or []:
+        if isinstance(item, str):
+            item = {"memory": item}
+        if isinstance(item, dict) and (item.get("memory") or "").strip():
+            records.append(item)
+    return records
+
+
+class WorkingSet:
+    """Memories retrieved so far in one advice session, reused by follow-up questions.
+
+    The first question runs the full retrieval and seeds the set; follow-ups
+    only add the memories their own small search returns that the session
+    has not seen. Memories are only ever appended, so the prompt prefix
+    built from the set (system role, then the set) is unchanged between
+    questions apart from new lines at its end, which keeps provider-side
+    prompt caching effective. Near duplicates of memories already in the
+    set are dropped. Memories that would push the set past `token_budget`
+    are sent with their question only, packed within the same budget.
+    """
+
+    def __init__(self, token_budget=600):
+        self.token_budget = token_budget
+        self.reset()
+
+    def reset(self, user_id=None):
+        self.user_id = user_id
+        self.records = []
+        self.tokens = 0
+        self.pending = []
+        self.duplicates_dropped = 0
+        self.questions = 0
+        self.memories_fetched = 0
+        self.memories_reused = 0
+        self.prefix_digest = ""
+        self.prefix_length = 0
+        self.prompt_tokens = 0
+        self.stable_prefix_tokens = 0
+        self._keys = set()
+
+    def to_dict(self):
+        """Serialize the working set so stateless callers can send it back with the next question"""
+        return {"token_budget": self.token_budget, "user_id": self.user_id, "records": self.records,
+                "questions": self.questions, "memories_fetched": self.memories_fetched,
+                "memories_reused": self.memories_reused, "prefix_digest": self.prefix_digest,
+                "prefix_length": self.prefix_length,
+                "prompt_tokens": self.prompt_tokens, "stable_prefix_tokens": self.stable_prefix_tokens}
+
+    @classmethod
+    def from_dict(cls, state, token_budget=None):
+        """Rebuild a serialized working set; `token_budget` overrides the one it was sent with"""
+        if token_budget is None:
+            token_budget = int(state.get("token_budget", 600))
+        working_set = cls(token_budget=token_budget)
+        working_set.user_id = state.get("user_id")
+        working_set._append(_records(state.get("records")))
+        for key in ("questions", "memories_fetched", "memories_reused", "prefix_length", "prompt_tokens",
+                    "stable_prefix_tokens"):
+            setattr(working_set, key, int(state.get(key, 0)))
+        working_set.prefix_digest = state.get("prefix_digest") or ""
+        return working_set
+
+    def _append(self, records):
+        for record in records:
+            cost = estimate_tokens(_line(record) + "\n")
+            if self.tokens + cost > self.token_budget:
+                continue
+            self.records.append(record)
+            self._keys.add(_key(record))
+            self.tokens += cost
+
+    def _overflow(self, records):
+        # Memories past the budget go with this question only, within a budget of their own
+        pending, used = [], 0
+        for record in records:
+            if _key(record) in self._keys:
+                continue
+            cost = estimate_tokens(_line(record) + "\n")
+            if used + cost <= self.token_budget:
+                pending.append(record)
+                used += cost
+        return pending
+
+    def is_followup(self, user_id):
+        """True once the session has retrieved memories for this user; a new user starts a fresh set"""
+        if user_id != self.user_id:
+            self.reset(user_id)
+        return bool(self.records)
+
+    def merge(self, memory_results):
+        """Add a question's search results and return every memory its prompt should include"""
+        self.questions += 1
+        candidates = []
+        for record in _records(memory_results):
+            key = _key(record)
+            if key in self._keys:
+                self.memories_reused += 1
+            elif key not in {_key(r) for r in candidates}:
+                candidates.append(record)
+        new = [record for record in dedupe_memories(self.records + candidates) if _key(record) not in self._keys]
+        self.duplicates_dropped = len(candidates) - len(new)
+        self.memories_fetched += len(new)
+        kept = len(self.records)
+        self._append(new)
+        self.pending = self._overflow(new)
+        return self.records[:kept] + [record for record in new if _key(record) in self._keys] + self.pending
+
+    def context(self):
+        return "\n".join(_line(record) for record in self.records)
+
+    def pending_context(self):
+        return "\n".join(_line(record) for record in self.pending)
+
+    def record_prompt(self, messages, prefix_messages=2):
+        """Count the prompt's tokens and how many of them repeat the previous prompt's prefix"""
+        prefix = "\n".join(m["content"] for m in messages[:prefix_messages])
+        if self.prefix_length and _digest(prefix[:self.prefix_length]) == self.prefix_digest:
+            self.stable_prefix_tokens += estimate_tokens(prefix[:self.prefix_length])
+        self.prompt_tokens += sum(estimate_tokens(m["content"]) for m in messages)
+        self.prefix_digest, self.prefix_length = _digest(prefix), len(prefix)
+
+    def report(self):
+        return {
+            "questions": self.questions,
+            "memories": len(self.records),
+            "memories_fetched": self.memories_fetched,
+            "memories_reused": self.memories_reused,
+            "context_tokens": self.tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "stable_prefix_tokens": self.stable_prefix_tokens,
+        }